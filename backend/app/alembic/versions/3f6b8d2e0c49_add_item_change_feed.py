@@ -0,0 +1,84 @@
+"""Add item change feed
+
+Revision ID: 3f6b8d2e0c49
+Revises: a7f0d3c95e21
+Create Date: 2026-10-17 19:02:16.640773
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f6b8d2e0c49"
+down_revision = "a7f0d3c95e21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows predate the feed and sort first; a constant default keeps the
+    # ALTER from rewriting the table.
+    op.add_column(
+        "item",
+        sa.Column("changed_txid", sa.BigInteger(), server_default="0", nullable=False),
+    )
+    op.alter_column("item", "changed_txid", server_default=sa.text("txid_current()"))
+    op.create_table(
+        "itemtombstone",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "changed_txid",
+            sa.BigInteger(),
+            server_default=sa.text("txid_current()"),
+            nullable=False,
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_itemtombstone_changed_txid_id",
+        "itemtombstone",
+        ["changed_txid", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_itemtombstone_owner_id_changed_txid_id",
+        "itemtombstone",
+        ["owner_id", "changed_txid", "id"],
+        unique=False,
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_item_changed_txid_id",
+            "item",
+            ["changed_txid", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_item_owner_id_changed_txid_id",
+            "item",
+            ["owner_id", "changed_txid", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_item_owner_id_changed_txid_id",
+            table_name="item",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_item_changed_txid_id", table_name="item", postgresql_concurrently=True
+        )
+    op.drop_index(
+        "ix_itemtombstone_owner_id_changed_txid_id", table_name="itemtombstone"
+    )
+    op.drop_index("ix_itemtombstone_changed_txid_id", table_name="itemtombstone")
+    op.drop_table("itemtombstone")
+    op.drop_column("item", "changed_txid")
@@ -0,0 +1,54 @@
+"""Add newsletter issues
+
+Revision ID: 5b8e2f1c9a7d
+Revises: d4867f3a4c0a
+Create Date: 2026-10-17 10:12:41.512034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b8e2f1c9a7d"
+down_revision = "d4867f3a4c0a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "issue",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("body", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_issue_id"), "issue", ["id"], unique=False)
+    op.create_table(
+        "issuechunk",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("issue_id", sa.Integer(), nullable=False),
+        sa.Column("first_user_id", sa.Integer(), nullable=False),
+        sa.Column("last_user_id", sa.Integer(), nullable=False),
+        sa.Column("sent_through_user_id", sa.Integer(), nullable=False),
+        sa.Column("recipient_count", sa.Integer(), nullable=False),
+        sa.Column("sent_count", sa.Integer(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["issue_id"], ["issue.id"],),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_issuechunk_id"), "issuechunk", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_issuechunk_issue_id"), "issuechunk", ["issue_id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_issuechunk_issue_id"), table_name="issuechunk")
+    op.drop_index(op.f("ix_issuechunk_id"), table_name="issuechunk")
+    op.drop_table("issuechunk")
+    op.drop_index(op.f("ix_issue_id"), table_name="issue")
+    op.drop_table("issue")
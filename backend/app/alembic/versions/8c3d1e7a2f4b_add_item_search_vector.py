@@ -0,0 +1,44 @@
+"""Add item search vector index
+
+Revision ID: 8c3d1e7a2f4b
+Revises: 5b8e2f1c9a7d
+Create Date: 2026-10-17 14:03:27.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8c3d1e7a2f4b"
+down_revision = "5b8e2f1c9a7d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # An expression index instead of a stored column, which would rewrite the
+    # whole table under an ACCESS EXCLUSIVE lock; built without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_item_search_vector",
+            "item",
+            [
+                sa.text(
+                    "to_tsvector('english', "
+                    "coalesce(title, '') || ' ' || coalesce(description, ''))"
+                )
+            ],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_item_search_vector",
+            table_name="item",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,32 @@
+"""Add row versions
+
+Revision ID: a7f0d3c95e21
+Revises: e2a9c4b7d1f3
+Create Date: 2026-10-17 17:45:52.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7f0d3c95e21"
+down_revision = "e2a9c4b7d1f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "item",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column(
+        "user",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("user", "version")
+    op.drop_column("item", "version")
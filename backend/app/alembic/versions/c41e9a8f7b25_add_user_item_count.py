@@ -0,0 +1,32 @@
+"""Add user item count
+
+Revision ID: c41e9a8f7b25
+Revises: 3f6b8d2e0c49
+Create Date: 2026-10-17 20:37:04.215598
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c41e9a8f7b25"
+down_revision = "3f6b8d2e0c49"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "user",
+        sa.Column("item_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        'UPDATE "user" SET item_count = counts.n '
+        "FROM (SELECT owner_id, count(*) AS n FROM item GROUP BY owner_id) AS counts "
+        'WHERE "user".id = counts.owner_id'
+    )
+
+
+def downgrade():
+    op.drop_column("user", "item_count")
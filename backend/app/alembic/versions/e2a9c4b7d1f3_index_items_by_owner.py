@@ -0,0 +1,44 @@
+"""Index items by owner
+
+Revision ID: e2a9c4b7d1f3
+Revises: 8c3d1e7a2f4b
+Create Date: 2026-10-17 15:21:08.337915
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e2a9c4b7d1f3"
+down_revision = "8c3d1e7a2f4b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Build and drop indexes without blocking writes to the item table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_item_owner_id_id",
+            "item",
+            ["owner_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_item_description"), table_name="item", postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_item_description"),
+            "item",
+            ["description"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_item_owner_id_id", table_name="item", postgresql_concurrently=True
+        )
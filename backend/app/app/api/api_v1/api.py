@@ -1,9 +1,47 @@
 from fastapi import APIRouter
+from fastapi.routing import APIRoute
 
-from app.api.api_v1.endpoints import items, login, users, utils
+from app.api.api_v1.endpoints import (
+    async_items,
+    async_users,
+    batch,
+    issues,
+    items,
+    login,
+    users,
+    utils,
+)
+from app.core.config import settings
+
+
+def with_async_routes(router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Copy of `router` where each route that `async_router` also defines (same path
+    and methods) is replaced by the async one, keeping the original route order.
+    """
+    async_routes = {
+        (route.path, frozenset(route.methods or ())): route
+        for route in async_router.routes
+        if isinstance(route, APIRoute)
+    }
+    merged = APIRouter()
+    for route in router.routes:
+        if isinstance(route, APIRoute):
+            key = (route.path, frozenset(route.methods or ()))
+            route = async_routes.get(key, route)
+        merged.routes.append(route)
+    return merged
+
+
+items_router, users_router = items.router, users.router
+if settings.USE_ASYNC_DATABASE:
+    items_router = with_async_routes(items.router, async_items.router)
+    users_router = with_async_routes(users.router, async_users.router)
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
-api_router.include_router(items.router, prefix="/items", tags=["items"])
+api_router.include_router(items_router, prefix="/items", tags=["items"])
+api_router.include_router(issues.router, prefix="/issues", tags=["issues"])
+api_router.include_router(batch.router, tags=["batch"])
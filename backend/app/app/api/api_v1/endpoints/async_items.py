@@ -0,0 +1,216 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import Column
+from sqlalchemy.engine.row import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.api import deps
+from app.api.api_v1.endpoints.items import get_cursor_after_id, set_next_cursor
+from app.core.responses import (
+    ORJSONResponse,
+    etag_matches,
+    generate_etag,
+    not_modified,
+    set_etag,
+)
+
+router = APIRouter()
+
+
+async def set_total_count(
+    response: Response, db: AsyncSession, *, current_user: models.User, exact: bool
+) -> None:
+    if crud.user.is_superuser(current_user):
+        total = await crud.async_item.count(db, exact=exact)
+    else:
+        total = await crud.async_item.count_by_owner(db, owner_id=current_user.id)
+    response.headers["X-Total-Count"] = str(total)
+
+
+async def get_item_rows(
+    db: AsyncSession,
+    *,
+    columns: List[Column],
+    current_user: models.User,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+) -> List[Row]:
+    if crud.user.is_superuser(current_user):
+        return await crud.async_item.get_multi_rows(
+            db, columns=columns, skip=skip, limit=limit, after_id=after_id
+        )
+    return await crud.async_item.get_multi_rows_by_owner(
+        db,
+        columns=columns,
+        owner_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        after_id=after_id,
+    )
+
+
+@router.get("/", response_model=List[schemas.Item])
+async def read_items(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    exact: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.Item)),
+) -> Any:
+    """
+    Retrieve items.
+
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`
+    (instead of `skip`) to fetch the next page by keyset.
+
+    `X-Total-Count` holds the number of items. For superusers it is the
+    planner's estimate unless `exact` is set.
+    """
+    after_id = get_cursor_after_id(cursor, current_user)
+    if if_none_match is not None:
+        versions = await get_item_rows(
+            db,
+            columns=[models.Item.id, models.Item.version],
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        etag = generate_etag(*((row.id, row.version) for row in versions))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    if fields is not None:
+        columns = crud.item.columns_for(schemas.Item, fields)
+        rows = await get_item_rows(
+            db,
+            columns=columns + [models.Item.version],
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        names = [column.name for column in columns]
+        fast_response = ORJSONResponse(
+            [{name: getattr(row, name) for name in names} for row in rows]
+        )
+        set_next_cursor(fast_response, rows, limit=limit, current_user=current_user)
+        await set_total_count(fast_response, db, current_user=current_user, exact=exact)
+        set_etag(fast_response, generate_etag(*((row.id, row.version) for row in rows)))
+        return fast_response
+    if crud.user.is_superuser(current_user):
+        items = await crud.async_item.get_multi(
+            db, skip=skip, limit=limit, after_id=after_id
+        )
+    else:
+        items = await crud.async_item.get_multi_by_owner(
+            db=db, owner_id=current_user.id, skip=skip, limit=limit, after_id=after_id
+        )
+    etag = generate_etag(*((item.id, item.version) for item in items))
+    set_next_cursor(response, items, limit=limit, current_user=current_user)
+    await set_total_count(response, db, current_user=current_user, exact=exact)
+    set_etag(response, etag)
+    return items
+
+
+@router.post("/", response_model=schemas.Item)
+async def create_item(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    item_in: schemas.ItemCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new item.
+    """
+    item = await crud.async_item.create_with_owner(
+        db=db, obj_in=item_in, owner_id=current_user.id
+    )
+    return item
+
+
+@router.put("/{id}", response_model=schemas.Item)
+async def update_item(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    item_in: schemas.ItemUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update an item.
+    """
+    item = await crud.async_item.get(db=db, id=id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    item = await crud.async_item.update(db=db, db_obj=item, obj_in=item_in)
+    return item
+
+
+@router.get("/{id}", response_model=schemas.Item)
+async def read_item(
+    *,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.Item)),
+) -> Any:
+    """
+    Get item by ID.
+    """
+    if fields is not None or if_none_match is not None:
+        columns = crud.item.columns_for(schemas.Item, (fields or []) + ["owner_id"])
+        row = await crud.async_item.get_row(
+            db, id=id, columns=columns + [models.Item.version]
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if not crud.user.is_superuser(current_user) and (
+            row.owner_id != current_user.id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        etag = generate_etag(id, row.version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        if fields is not None:
+            fast_response = ORJSONResponse(
+                {name: getattr(row, name) for name in fields}
+            )
+            set_etag(fast_response, etag)
+            return fast_response
+    item = await crud.async_item.get(db=db, id=id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    set_etag(response, generate_etag(id, item.version))
+    return item
+
+
+@router.delete("/{id}", response_model=schemas.Item)
+async def delete_item(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Delete an item.
+    """
+    item = await crud.async_item.get(db=db, id=id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    item = await crud.async_item.remove(db=db, id=id)
+    return item
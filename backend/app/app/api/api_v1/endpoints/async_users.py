@@ -0,0 +1,87 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.api import deps
+from app.api.api_v1.endpoints.users import get_cursor_after_id, set_next_cursor
+from app.core.responses import ORJSONResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.User])
+async def read_users(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_superuser_async),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.User)),
+) -> Any:
+    """
+    Retrieve users.
+
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`
+    (instead of `skip`) to fetch the next page by keyset.
+    """
+    after_id = get_cursor_after_id(cursor)
+    if fields is not None:
+        rows = await crud.async_user.get_multi_rows(
+            db,
+            columns=crud.user.columns_for(schemas.User, fields),
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        fast_response = ORJSONResponse([row._asdict() for row in rows])
+        set_next_cursor(fast_response, rows, limit=limit)
+        return fast_response
+    users = await crud.async_user.get_multi(
+        db, skip=skip, limit=limit, after_id=after_id
+    )
+    set_next_cursor(response, users, limit=limit)
+    return users
+
+
+@router.get("/me", response_model=schemas.User)
+async def read_user_me(
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Get current user.
+    """
+    return current_user
+
+
+@router.get("/{user_id}", response_model=schemas.User)
+async def read_user_by_id(
+    user_id: int,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.User)),
+    db: AsyncSession = Depends(deps.get_async_db),
+) -> Any:
+    """
+    Get a specific user by id.
+    """
+    if fields is not None:
+        if user_id != current_user.id and not crud.user.is_superuser(current_user):
+            raise HTTPException(
+                status_code=400, detail="The user doesn't have enough privileges"
+            )
+        row = await crud.async_user.get_row(
+            db, id=user_id, columns=crud.user.columns_for(schemas.User, fields)
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        return ORJSONResponse(row._asdict())
+    user = await crud.async_user.get(db, id=user_id)
+    if user == current_user:
+        return user
+    if not crud.user.is_superuser(current_user):
+        raise HTTPException(
+            status_code=400, detail="The user doesn't have enough privileges"
+        )
+    return user
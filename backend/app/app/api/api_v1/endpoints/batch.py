@@ -0,0 +1,195 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.types import Message
+
+from app import models, schemas
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+
+router = APIRouter()
+
+BATCH_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+
+class BatchSession:
+    def __init__(self, *, atomic: bool):
+        """
+        Session shared by the sub-requests of one batch.
+
+        With `atomic`, the session runs inside an outer transaction on a single
+        connection, and each `commit()` of the CRUD layer only releases a
+        savepoint, so `rollback` can still undo every operation.
+        """
+        self.atomic = atomic
+        self.connection: Optional[Connection] = None
+        if atomic:
+            self.connection = engine.connect()
+            self.transaction = self.connection.begin()
+            self.db: Session = SessionLocal(bind=self.connection)
+            self.nested = self.connection.begin_nested()
+            event.listen(self.db, "after_transaction_end", self._restart_savepoint)
+        else:
+            self.db = SessionLocal()
+
+    def _restart_savepoint(self, session: Session, transaction: Any) -> None:
+        # Only registered for atomic batches, which always hold a connection
+        assert self.connection is not None
+        if not self.nested.is_active:
+            self.nested = self.connection.begin_nested()
+
+    def commit(self) -> None:
+        if self.atomic:
+            self.transaction.commit()
+
+    def rollback(self) -> None:
+        if self.atomic:
+            self.transaction.rollback()
+
+    def close(self) -> None:
+        self.db.close()
+        if self.connection is not None:
+            self.connection.close()
+
+
+def check_operation(operation: schemas.BatchOperation) -> Tuple[str, str]:
+    method = operation.method.upper()
+    if method not in BATCH_METHODS:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported batch method: {operation.method}"
+        )
+    path = operation.path
+    if not path.startswith("/") or urlsplit(path).path.rstrip("/") == "/batch":
+        raise HTTPException(status_code=400, detail=f"Invalid batch path: {path}")
+    return method, path
+
+
+def decode_body(headers: Dict[str, str], body: bytes) -> Optional[Any]:
+    if not body:
+        return None
+    if headers.get("content-type", "").startswith("application/json"):
+        return json.loads(body)
+    return body.decode(errors="replace")
+
+
+async def dispatch(
+    request: Request,
+    *,
+    method: str,
+    path: str,
+    body: Optional[Any],
+    db: Session,
+    user: models.User,
+) -> schemas.BatchResult:
+    """
+    Run one sub-request through the application, in-process, with the batch's
+    session and user in its scope for `deps.get_db` and `deps.get_current_user`.
+    """
+    url = urlsplit(path)
+    headers = [(b"content-type", b"application/json")]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode("latin-1")))
+    full_path = settings.API_V1_STR + url.path
+    scope = {
+        "type": "http",
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": full_path,
+        "raw_path": full_path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "batch_db": db,
+        "batch_user": user,
+    }
+    request_body = b"" if body is None else json.dumps(body).encode()
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": request_body, "more_body": False}
+
+    status = 500
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for key, value in message.get("headers", []):
+                response_headers[key.decode("latin-1")] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware re-raises after sending its 500 response
+        if not chunks:
+            raise
+    response_headers.pop("content-length", None)
+    return schemas.BatchResult(
+        status=status,
+        headers=response_headers,
+        body=decode_body(response_headers, b"".join(chunks)),
+    )
+
+
+@router.post("/batch", response_model=schemas.BatchResponse)
+async def run_batch(
+    request: Request,
+    batch_in: schemas.BatchRequest,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Run several API calls in one request.
+
+    The sub-requests run in order against the regular routes, authenticated once
+    and sharing one database session. With `atomic`, they also share one
+    transaction: the batch stops at the first error response and every change
+    made by the earlier operations is rolled back.
+    """
+    if len(batch_in.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations per batch",
+        )
+    operations = [
+        (*check_operation(operation), operation.body)
+        for operation in batch_in.operations
+    ]
+    batch = await run_in_threadpool(BatchSession, atomic=batch_in.atomic)
+    try:
+        user = batch.db.merge(current_user, load=False)
+        results = []
+        rolled_back = False
+        for method, path, body in operations:
+            result = await dispatch(
+                request, method=method, path=path, body=body, db=batch.db, user=user
+            )
+            results.append(result)
+            if batch.atomic and result.status >= 400:
+                await run_in_threadpool(batch.rollback)
+                rolled_back = True
+                break
+        else:
+            await run_in_threadpool(batch.commit)
+        return schemas.BatchResponse(results=results, rolled_back=rolled_back)
+    finally:
+        await run_in_threadpool(batch.close)
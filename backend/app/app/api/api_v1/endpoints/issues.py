@@ -0,0 +1,102 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.api import deps
+from app.core.celery_app import celery_app
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Issue)
+def create_issue(
+    *,
+    db: Session = Depends(deps.get_db),
+    issue_in: schemas.IssueCreate,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Create a newsletter issue.
+
+    `subject` and `body` are Jinja templates rendered per recipient with
+    `project_name`, `email` and `full_name`.
+    """
+    issue = crud.issue.create(db, obj_in=issue_in)
+    return issue
+
+
+@router.get("/{id}", response_model=schemas.Issue)
+def read_issue(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get issue by ID.
+    """
+    issue = crud.issue.get(db, id=id)
+    if not issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    return issue
+
+
+@router.post("/{id}/send", response_model=schemas.Issue)
+def send_issue(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Send an issue to every active user.
+    """
+    issue = crud.issue.get(db, id=id)
+    if not issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    if issue.sent_at:
+        raise HTTPException(status_code=400, detail="The issue was already sent")
+    issue = crud.issue.mark_sent(db, db_obj=issue)
+    celery_app.send_task("app.worker.fan_out_issue", args=[issue.id])
+    return issue
+
+
+@router.post("/{id}/resume", response_model=schemas.IssueProgress)
+def resume_issue(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Requeue an interrupted send: finish chunking and every unfinished chunk.
+
+    Recipients already reached are skipped.
+    """
+    issue = crud.issue.get(db, id=id)
+    if not issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    if not issue.sent_at:
+        raise HTTPException(status_code=400, detail="The issue was not sent yet")
+    for chunk in crud.issue.get_incomplete_chunks(db, issue_id=issue.id):
+        celery_app.send_task("app.worker.send_issue_chunk", args=[chunk.id])
+    celery_app.send_task("app.worker.fan_out_issue", args=[issue.id])
+    return crud.issue.get_progress(db, issue_id=issue.id)
+
+
+@router.get("/{id}/progress", response_model=schemas.IssueProgress)
+def read_issue_progress(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Delivery progress of an issue.
+    """
+    issue = crud.issue.get(db, id=id)
+    if not issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    return crud.issue.get_progress(db, issue_id=issue.id)
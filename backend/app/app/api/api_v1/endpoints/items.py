@@ -1,33 +1,334 @@
-from typing import Any, List
+import asyncio
+import json
+from enum import Enum
+from typing import Any, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response
+from sqlalchemy import Column
+from sqlalchemy.engine.row import Row
 from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core.config import settings
+from app.core.responses import (
+    ORJSONResponse,
+    etag_matches,
+    generate_etag,
+    not_modified,
+    set_etag,
+)
+from app.item_feed import item_feed
+from app.utils import (
+    decode_page_cursor,
+    decode_ranked_page_cursor,
+    generate_page_cursor,
+    iter_csv,
+    iter_ndjson,
+)
 
 router = APIRouter()
 
+EXPORT_COLUMNS = ["id", "title", "description", "owner_id"]
+EXPORT_BATCH_SIZE = 1000
+# Comment lines sent on an idle feed, so proxies keep the connection open
+FEED_KEEPALIVE_SECONDS = 15
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def get_cursor_after_id(
+    cursor: Optional[str], current_user: models.User
+) -> Optional[int]:
+    if cursor is None:
+        return None
+    keys = decode_page_cursor(cursor)
+    if (
+        not keys
+        or "id" not in keys
+        or (
+            not crud.user.is_superuser(current_user)
+            and keys.get("owner_id") != current_user.id
+        )
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return keys["id"]
+
+
+def set_next_cursor(
+    response: Response, items: List[Any], *, limit: int, current_user: models.User,
+) -> None:
+    if not items or len(items) < limit:
+        return
+    if crud.user.is_superuser(current_user):
+        next_cursor = generate_page_cursor(id=items[-1].id)
+    else:
+        next_cursor = generate_page_cursor(owner_id=current_user.id, id=items[-1].id)
+    response.headers["X-Next-Cursor"] = next_cursor
+
+
+def set_total_count(
+    response: Response, db: Session, *, current_user: models.User, exact: bool
+) -> None:
+    if crud.user.is_superuser(current_user):
+        total = crud.item.count(db, exact=exact)
+    else:
+        total = crud.item.count_by_owner(db, owner_id=current_user.id)
+    response.headers["X-Total-Count"] = str(total)
+
+
+def get_item_rows(
+    db: Session,
+    *,
+    columns: List[Column],
+    current_user: models.User,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+) -> List[Row]:
+    if crud.user.is_superuser(current_user):
+        return crud.item.get_multi_rows(
+            db, columns=columns, skip=skip, limit=limit, after_id=after_id
+        )
+    return crud.item.get_multi_rows_by_owner(
+        db,
+        columns=columns,
+        owner_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        after_id=after_id,
+    )
+
 
 @router.get("/", response_model=List[schemas.Item])
 def read_items(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    exact: bool = False,
+    if_none_match: Optional[str] = Header(None),
     current_user: models.User = Depends(deps.get_current_active_user),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.Item)),
 ) -> Any:
     """
     Retrieve items.
+
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`
+    (instead of `skip`) to fetch the next page by keyset.
+
+    `X-Total-Count` holds the number of items. For superusers it is the
+    planner's estimate unless `exact` is set.
     """
+    after_id = get_cursor_after_id(cursor, current_user)
+    if if_none_match is not None:
+        # The page's ETag only needs its (id, version) pairs, so a client that is
+        # up to date gets its 304 before any full row is loaded.
+        versions = get_item_rows(
+            db,
+            columns=[models.Item.id, models.Item.version],
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        etag = generate_etag(*((row.id, row.version) for row in versions))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    if fields is not None or settings.USE_FAST_JSON_RESPONSES:
+        columns = crud.item.columns_for(schemas.Item, fields)
+        rows = get_item_rows(
+            db,
+            columns=columns + [models.Item.version],
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        names = [column.name for column in columns]
+        fast_response = ORJSONResponse(
+            [{name: getattr(row, name) for name in names} for row in rows]
+        )
+        set_next_cursor(fast_response, rows, limit=limit, current_user=current_user)
+        set_total_count(fast_response, db, current_user=current_user, exact=exact)
+        set_etag(fast_response, generate_etag(*((row.id, row.version) for row in rows)))
+        return fast_response
     if crud.user.is_superuser(current_user):
-        items = crud.item.get_multi(db, skip=skip, limit=limit)
+        items = crud.item.get_multi(db, skip=skip, limit=limit, after_id=after_id)
     else:
         items = crud.item.get_multi_by_owner(
-            db=db, owner_id=current_user.id, skip=skip, limit=limit
+            db=db, owner_id=current_user.id, skip=skip, limit=limit, after_id=after_id
         )
+    etag = generate_etag(*((item.id, item.version) for item in items))
+    set_next_cursor(response, items, limit=limit, current_user=current_user)
+    set_total_count(response, db, current_user=current_user, exact=exact)
+    set_etag(response, etag)
     return items
 
 
+@router.get("/changes", response_model=schemas.ItemChanges)
+def read_item_changes(
+    db: Session = Depends(deps.get_db),
+    since: Optional[str] = None,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Items created, updated or deleted since the `since` cursor, oldest first.
+
+    Start without `since` to get every item, then keep passing back the
+    returned `cursor`; fetch again right away while `has_more` is true.
+    """
+    is_superuser = crud.user.is_superuser(current_user)
+    after = None
+    if since is not None:
+        keys = decode_page_cursor(since)
+        if (
+            not keys
+            or "txid" not in keys
+            or "id" not in keys
+            or (not is_superuser and keys.get("owner_id") != current_user.id)
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (keys["txid"], keys["id"])
+    changes = crud.item.get_changes(
+        db,
+        owner_id=None if is_superuser else current_user.id,
+        after=after,
+        limit=limit,
+    )
+    cursor = since
+    if changes:
+        next_keys = {"txid": changes[-1].changed_txid, "id": changes[-1].id}
+        if not is_superuser:
+            next_keys["owner_id"] = current_user.id
+        cursor = generate_page_cursor(**next_keys)
+    return {
+        "changes": [change._asdict() for change in changes],
+        "cursor": cursor,
+        "has_more": len(changes) == limit,
+    }
+
+
+@router.get("/feed")
+async def read_item_feed(
+    request: Request, current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Server-sent events for items (a user's own, unless superuser) as they are
+    created, updated and deleted.
+
+    Each event is `{"action", "owner_id", "ids"}`, or `{"action": "resync"}`
+    after events may have been missed; fetch `/items/changes` to catch up.
+    """
+    if settings.DB_USE_PGBOUNCER:
+        raise HTTPException(
+            status_code=503, detail="The item feed is unavailable through PgBouncer"
+        )
+    subscription = item_feed.subscribe(
+        None if crud.user.is_superuser(current_user) else current_user.id
+    )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), FEED_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            item_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/search", response_model=List[schemas.Item])
+def search_items(
+    response: Response,
+    q: str,
+    db: Session = Depends(deps.get_db),
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Search items by title and description, best matches first.
+
+    `q` takes web search syntax: `"quoted phrases"`, `-excluded` words and `or`.
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`.
+    """
+    is_superuser = crud.user.is_superuser(current_user)
+    after = None
+    if cursor is not None:
+        decoded = decode_ranked_page_cursor(cursor)
+        if (
+            not decoded
+            or "id" not in decoded[1]
+            or (not is_superuser and decoded[1].get("owner_id") != current_user.id)
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rank, keys = decoded
+        after = (rank, keys["id"])
+    results = crud.item.search(
+        db=db,
+        q=q,
+        owner_id=None if is_superuser else current_user.id,
+        limit=limit,
+        after=after,
+    )
+    if results and len(results) == limit:
+        last_item, last_rank = results[-1]
+        next_keys = {"rank": last_rank, "id": last_item.id}
+        if not is_superuser:
+            next_keys["owner_id"] = current_user.id
+        response.headers["X-Next-Cursor"] = generate_page_cursor(**next_keys)
+    return [item for item, _ in results]
+
+
+@router.get("/export")
+def export_items(
+    db: Session = Depends(deps.get_db),
+    format: ExportFormat = ExportFormat.ndjson,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Export all items (a user's own, unless superuser) as NDJSON or CSV.
+
+    Rows are streamed from a server-side cursor, so memory use doesn't grow
+    with the number of items.
+    """
+    rows = crud.item.iter_rows(
+        db,
+        owner_id=None if crud.user.is_superuser(current_user) else current_user.id,
+        batch_size=EXPORT_BATCH_SIZE,
+    )
+    if format == ExportFormat.csv:
+        content = iter_csv(rows, columns=EXPORT_COLUMNS, batch_size=EXPORT_BATCH_SIZE)
+        media_type = "text/csv"
+    else:
+        content = iter_ndjson(
+            rows, columns=EXPORT_COLUMNS, batch_size=EXPORT_BATCH_SIZE
+        )
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{format.value}"'},
+    )
+
+
 @router.post("/", response_model=schemas.Item)
 def create_item(
     *,
@@ -42,6 +343,85 @@ def create_item(
     return item
 
 
+def check_bulk_size(size: int) -> None:
+    if size > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per bulk request",
+        )
+
+
+def get_owned_items(
+    db: Session, *, ids: List[int], current_user: models.User
+) -> List[models.Item]:
+    items = crud.item.get_multi_by_ids(db=db, ids=ids)
+    if len(items) != len(set(ids)):
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not crud.user.is_superuser(current_user) and any(
+        item.owner_id != current_user.id for item in items
+    ):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return items
+
+
+@router.post("/bulk", response_model=List[schemas.Item])
+def create_items(
+    *,
+    db: Session = Depends(deps.get_db),
+    items_in: List[schemas.ItemCreate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create new items in a single transaction.
+    """
+    check_bulk_size(len(items_in))
+    items = crud.item.create_multi_with_owner(
+        db=db, objs_in=items_in, owner_id=current_user.id
+    )
+    return items
+
+
+@router.patch("/bulk", response_model=List[schemas.Item])
+def update_items(
+    *,
+    db: Session = Depends(deps.get_db),
+    items_in: List[schemas.ItemBulkUpdate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Update items in a single transaction.
+    """
+    check_bulk_size(len(items_in))
+    items = get_owned_items(
+        db, ids=[item_in.id for item_in in items_in], current_user=current_user
+    )
+    items_by_id = {item.id: item for item in items}
+    items = crud.item.update_multi(
+        db=db,
+        db_objs=[items_by_id[item_in.id] for item_in in items_in],
+        objs_in=[
+            item_in.dict(exclude={"id"}, exclude_unset=True) for item_in in items_in
+        ],
+    )
+    return items
+
+
+@router.delete("/bulk", response_model=List[schemas.Item])
+def delete_items(
+    *,
+    db: Session = Depends(deps.get_db),
+    ids: List[int] = Body(...),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Delete items in a single transaction.
+    """
+    check_bulk_size(len(ids))
+    get_owned_items(db, ids=ids, current_user=current_user)
+    items = crud.item.remove_multi(db=db, ids=ids)
+    return items
+
+
 @router.put("/{id}", response_model=schemas.Item)
 def update_item(
     *,
@@ -65,18 +445,41 @@ def update_item(
 @router.get("/{id}", response_model=schemas.Item)
 def read_item(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     id: int,
+    if_none_match: Optional[str] = Header(None),
     current_user: models.User = Depends(deps.get_current_active_user),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.Item)),
 ) -> Any:
     """
     Get item by ID.
     """
+    if fields is not None or if_none_match is not None:
+        # Only the requested fields, or just what the ETag check needs
+        columns = crud.item.columns_for(schemas.Item, (fields or []) + ["owner_id"])
+        row = crud.item.get_row(db, id=id, columns=columns + [models.Item.version])
+        if not row:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if not crud.user.is_superuser(current_user) and (
+            row.owner_id != current_user.id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        etag = generate_etag(id, row.version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        if fields is not None:
+            fast_response = ORJSONResponse(
+                {name: getattr(row, name) for name in fields}
+            )
+            set_etag(fast_response, etag)
+            return fast_response
     item = crud.item.get(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    set_etag(response, generate_etag(id, item.version))
     return item
 
 
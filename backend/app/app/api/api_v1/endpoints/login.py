@@ -4,29 +4,33 @@ from typing import Any
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import crud, models, schemas
 from app.api import deps
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.utils import (
+    build_reset_password_email,
+    enqueue_emails,
     generate_password_reset_token,
-    send_reset_password_email,
     verify_password_reset_token,
 )
 
 router = APIRouter()
 
 
+# The password endpoints are async so that no threadpool thread sits waiting for
+# bcrypt; their queries still run in the threadpool.
 @router.post("/login/access-token", response_model=schemas.Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.user.authenticate(
+    user = await crud.user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -63,14 +67,18 @@ def recover_password(email: str, db: Session = Depends(deps.get_db)) -> Any:
             detail="The user with this username does not exist in the system.",
         )
     password_reset_token = generate_password_reset_token(email=email)
-    send_reset_password_email(
-        email_to=user.email, email=email, token=password_reset_token
+    enqueue_emails(
+        [
+            build_reset_password_email(
+                email_to=user.email, email=email, token=password_reset_token
+            )
+        ]
     )
     return {"msg": "Password recovery email sent"}
 
 
 @router.post("/reset-password/", response_model=schemas.Msg)
-def reset_password(
+async def reset_password(
     token: str = Body(...),
     new_password: str = Body(...),
     db: Session = Depends(deps.get_db),
@@ -81,7 +89,7 @@ def reset_password(
     email = verify_password_reset_token(token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = crud.user.get_by_email(db, email=email)
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -89,8 +97,8 @@ def reset_password(
         )
     elif not crud.user.is_active(user):
         raise HTTPException(status_code=400, detail="Inactive user")
-    hashed_password = get_password_hash(new_password)
-    user.hashed_password = hashed_password
-    db.add(user)
-    db.commit()
+    hashed_password = await get_password_hash_async(new_password)
+    await run_in_threadpool(
+        crud.user.set_password_hash, db, user=user, hashed_password=hashed_password
+    )
     return {"msg": "Password updated successfully"}
@@ -1,34 +1,103 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from pydantic.networks import EmailStr
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import crud, models, schemas
 from app.api import deps
 from app.core.config import settings
-from app.utils import send_new_account_email
+from app.core.responses import (
+    ORJSONResponse,
+    etag_matches,
+    generate_etag,
+    not_modified,
+    set_etag,
+)
+from app.utils import (
+    build_new_account_email,
+    decode_page_cursor,
+    enqueue_emails,
+    generate_page_cursor,
+    generate_password_reset_token,
+)
 
 router = APIRouter()
 
 
+def get_cursor_after_id(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    keys = decode_page_cursor(cursor)
+    if not keys or "id" not in keys:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return keys["id"]
+
+
+def set_next_cursor(response: Response, users: List[Any], *, limit: int) -> None:
+    if users and len(users) == limit:
+        response.headers["X-Next-Cursor"] = generate_page_cursor(id=users[-1].id)
+
+
 @router.get("/", response_model=List[schemas.User])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: models.User = Depends(deps.get_current_active_superuser),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.User)),
 ) -> Any:
     """
     Retrieve users.
+
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`
+    (instead of `skip`) to fetch the next page by keyset.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
+    after_id = get_cursor_after_id(cursor)
+    if if_none_match is not None:
+        # The page's ETag only needs its (id, version) pairs, so a client that is
+        # up to date gets its 304 before any full row is loaded.
+        versions = crud.user.get_multi_rows(
+            db,
+            columns=[models.User.id, models.User.version],
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        etag = generate_etag(*((row.id, row.version) for row in versions))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    if fields is not None or settings.USE_FAST_JSON_RESPONSES:
+        columns = crud.user.columns_for(schemas.User, fields)
+        rows = crud.user.get_multi_rows(
+            db,
+            columns=columns + [models.User.version],
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        names = [column.name for column in columns]
+        fast_response = ORJSONResponse(
+            [{name: getattr(row, name) for name in names} for row in rows]
+        )
+        set_next_cursor(fast_response, rows, limit=limit)
+        set_etag(fast_response, generate_etag(*((row.id, row.version) for row in rows)))
+        return fast_response
+    users = crud.user.get_multi(db, skip=skip, limit=limit, after_id=after_id)
+    set_next_cursor(response, users, limit=limit)
+    set_etag(response, generate_etag(*((user.id, user.version) for user in users)))
     return users
 
 
+# The endpoints that hash passwords are async so that no threadpool thread sits
+# waiting for bcrypt; their queries still run in the threadpool.
 @router.post("/", response_model=schemas.User)
-def create_user(
+async def create_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserCreate,
@@ -37,22 +106,25 @@ def create_user(
     """
     Create new user.
     """
-    user = crud.user.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
-    user = crud.user.create(db, obj_in=user_in)
+    user = await crud.user.create_async(db, obj_in=user_in)
     if settings.EMAILS_ENABLED and user_in.email:
-        send_new_account_email(
-            email_to=user_in.email, username=user_in.email, password=user_in.password
+        email = build_new_account_email(
+            email_to=user_in.email,
+            username=user_in.email,
+            token=generate_password_reset_token(email=user_in.email),
         )
+        await run_in_threadpool(enqueue_emails, [email])
     return user
 
 
 @router.put("/me", response_model=schemas.User)
-def update_user_me(
+async def update_user_me(
     *,
     db: Session = Depends(deps.get_db),
     password: str = Body(None),
@@ -71,23 +143,30 @@ def update_user_me(
         user_in.full_name = full_name
     if email is not None:
         user_in.email = email
-    user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
+    user = await crud.user.update_async(db, db_obj=current_user, obj_in=user_in)
     return user
 
 
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
+    response: Response,
     db: Session = Depends(deps.get_db),
+    if_none_match: Optional[str] = Header(None),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
     """
+    # The principal carries its version, so no query is needed for the ETag
+    etag = generate_etag(current_user.id, current_user.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return current_user
 
 
 @router.post("/open", response_model=schemas.User)
-def create_user_open(
+async def create_user_open(
     *,
     db: Session = Depends(deps.get_db),
     password: str = Body(...),
@@ -102,14 +181,14 @@ def create_user_open(
             status_code=403,
             detail="Open user registration is forbidden on this server",
         )
-    user = crud.user.get_by_email(db, email=email)
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system",
         )
     user_in = schemas.UserCreate(password=password, email=email, full_name=full_name)
-    user = crud.user.create(db, obj_in=user_in)
+    user = await crud.user.create_async(db, obj_in=user_in)
     return user
 
 
@@ -117,14 +196,26 @@ def create_user_open(
 def read_user_by_id(
     user_id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
+    fields: Optional[List[str]] = Depends(deps.get_fieldset(schemas.User)),
     db: Session = Depends(deps.get_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
+    if fields is not None:
+        if user_id != current_user.id and not crud.user.is_superuser(current_user):
+            raise HTTPException(
+                status_code=400, detail="The user doesn't have enough privileges"
+            )
+        row = crud.user.get_row(
+            db, id=user_id, columns=crud.user.columns_for(schemas.User, fields)
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        return ORJSONResponse(row._asdict())
+    if user_id == current_user.id:
+        return current_user
     user = crud.user.get(db, id=user_id)
-    if user == current_user:
-        return user
     if not crud.user.is_superuser(current_user):
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
@@ -133,7 +224,7 @@ def read_user_by_id(
 
 
 @router.put("/{user_id}", response_model=schemas.User)
-def update_user(
+async def update_user(
     *,
     db: Session = Depends(deps.get_db),
     user_id: int,
@@ -143,11 +234,11 @@ def update_user(
     """
     Update a user.
     """
-    user = crud.user.get(db, id=user_id)
+    user = await run_in_threadpool(crud.user.get, db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="The user with this username does not exist in the system",
         )
-    user = crud.user.update(db, db_obj=user, obj_in=user_in)
+    user = await crud.user.update_async(db, db_obj=user, obj_in=user_in)
     return user
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
@@ -6,6 +6,10 @@ from pydantic.networks import EmailStr
 from app import models, schemas
 from app.api import deps
 from app.core.celery_app import celery_app
+from app.core.principal_cache import principal_cache
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine, replica_pool
+from app.db.slow_queries import slow_query_log
 from app.utils import send_test_email
 
 router = APIRouter()
@@ -33,3 +37,38 @@ def test_email(
     """
     send_test_email(email_to=email_to)
     return {"msg": "Test email sent"}
+
+
+@router.get("/principal-cache/", response_model=Dict[str, int])
+def read_principal_cache_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Hit/miss counters of this worker's principal cache.
+    """
+    return principal_cache.stats()
+
+
+@router.get("/db-pool/", response_model=Dict[str, Any])
+def read_db_pool_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Occupancy, checkout counts and hold times of this worker's connection pools.
+    """
+    return {
+        "primary": pool_status(engine),
+        "replicas": [pool_status(replica.engine) for replica in replica_pool.replicas],
+        "async": pool_status(async_engine.sync_engine) if async_engine else None,
+    }
+
+
+@router.get("/slow-queries/", response_model=List[Dict[str, Any]])
+def read_slow_queries(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    This worker's most recent statements over SLOW_QUERY_THRESHOLD_MS, newest
+    last, with their EXPLAIN plans once captured.
+    """
+    return slow_query_log.entries()
@@ -1,22 +1,30 @@
-from typing import Generator
+from typing import AsyncGenerator, Callable, Generator, List, Optional, Type
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.requests import Request
 
 from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
-def get_db() -> Generator:
+def get_db(request: Request) -> Generator:
+    # Sub-requests of POST /batch share the batch's session, which it closes.
+    batch_db = request.scope.get("batch_db")
+    if batch_db is not None:
+        yield batch_db
+        return
+    # Sessions only check out a pooled connection on their first query.
     try:
         db = SessionLocal()
         yield db
@@ -24,20 +32,38 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> models.User:
+async def get_async_db() -> AsyncGenerator:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("The async database is disabled; set USE_ASYNC_DATABASE")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_token_data(token: str = Depends(reusable_oauth2)) -> schemas.TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = schemas.TokenPayload(**payload)
+        return schemas.TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud.user.get(db, id=token_data.sub)
+
+
+# The token is validated before the session dependency is resolved, so requests
+# with a bad token never reach the database.
+def get_current_user(
+    request: Request,
+    token_data: schemas.TokenPayload = Depends(get_token_data),
+    db: Session = Depends(get_db),
+) -> models.User:
+    # POST /batch has already loaded the user into the shared session
+    batch_user = request.scope.get("batch_user")
+    if batch_user is not None and batch_user.id == token_data.sub:
+        return batch_user
+    user = crud.user.get_principal(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -59,3 +85,51 @@ def get_current_active_superuser(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+async def get_current_user_async(
+    token_data: schemas.TokenPayload = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    user = await crud.async_user.get_principal(db, id=token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: models.User = Depends(get_current_user_async),
+) -> models.User:
+    return get_current_active_user(current_user)
+
+
+async def get_current_active_superuser_async(
+    current_user: models.User = Depends(get_current_user_async),
+) -> models.User:
+    return get_current_active_superuser(current_user)
+
+
+def get_fieldset(schema: Type[BaseModel]) -> Callable[..., Optional[List[str]]]:
+    """
+    Dependency parsing a `fields` query parameter into a list of `schema` field
+    names, or None when the parameter isn't given. `id` is always included.
+    """
+
+    def fieldset(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return (id is always included): "
+            + ", ".join(schema.__fields__),
+        )
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        names = ["id"] + [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in schema.__fields__]
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        return list(dict.fromkeys(names))
+
+    return fieldset
@@ -0,0 +1,64 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+from dotenv import set_key
+
+from app.core.config import settings
+from app.core.security import get_crypt_context
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+SAMPLES = 3
+
+
+def measure(rounds: int) -> float:
+    """
+    Best-of-`SAMPLES` time in milliseconds to hash one password at `rounds`.
+    """
+    context = get_crypt_context(settings.PASSWORD_HASH_SCHEMES, rounds)
+    timings = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        context.hash("calibration")
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def calibrate(target_ms: float) -> int:
+    """
+    Highest rounds whose hash time on this host stays within `target_ms`.
+    """
+    best = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure(rounds)
+        logger.info(f"rounds={rounds:>2}: {elapsed:8.1f}ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return best
+
+
+def main(target_ms: float, env_file: Optional[str]) -> None:
+    logger.info(f"Calibrating {settings.PASSWORD_HASH_SCHEMES[0]} for {target_ms}ms")
+    rounds = calibrate(target_ms)
+    logger.info(f"PASSWORD_HASH_ROUNDS={rounds}")
+    if env_file:
+        set_key(env_file, "PASSWORD_HASH_ROUNDS", str(rounds), quote_mode="never")
+        logger.info(f"Written to {env_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pick PASSWORD_HASH_ROUNDS for the hash time budget on this host"
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=250, help="Time budget for one hash"
+    )
+    parser.add_argument("--env-file", help="Write the result into this .env file")
+    args = parser.parse_args()
+    main(args.target_ms, args.env_file)
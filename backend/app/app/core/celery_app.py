@@ -1,7 +1,17 @@
 from celery import Celery
+from celery.signals import before_task_publish
 
 from app.core.config import settings
+from app.core.metrics import on_task_publish
 
 celery_app = Celery("worker", broker=f"amqp://guest@{settings.QUEUE_URL}//")
 
-celery_app.conf.task_routes = {"app.worker.test_celery": "main-queue"}
+celery_app.conf.task_routes = {
+    "app.worker.test_celery": "main-queue",
+    "app.worker.send_emails": "main-queue",
+    "app.worker.fan_out_issue": "newsletter-queue",
+    "app.worker.send_issue_chunk": "newsletter-queue",
+}
+
+# Stamps each message so workers can measure how long it waited in the queue
+before_task_publish.connect(on_task_publish, weak=False)
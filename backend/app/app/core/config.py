@@ -51,6 +51,100 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
 
+    # Connection pool of each engine (primary, every replica, async), per process.
+    # DB_POOL_RECYCLE replaces connections older than that many seconds (-1: never)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    # Postgres statement_timeout set on every new connection; 0 leaves the server's
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Connect through PgBouncer in transaction pooling mode: no client-side pool,
+    # no asyncpg prepared statement caches, and no startup options (so set
+    # statement_timeout on the database role instead). The item feed needs LISTEN
+    # on a session-level connection, so it is disabled.
+    DB_USE_PGBOUNCER: bool = False
+
+    # Optional streaming replicas that serve CRUDBase's plain reads (`get`,
+    # `get_multi`, ...) until a session first writes; replicas lagging more than
+    # REPLICA_MAX_LAG_SECONDS behind, or unreachable, are skipped for the primary
+    SQLALCHEMY_REPLICA_URIS: List[PostgresDsn] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 1
+
+    @validator("SQLALCHEMY_REPLICA_URIS", pre=True)
+    def assemble_replica_uris(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, (list, str)):
+            return v
+        raise ValueError(v)
+
+    # Serve the item/user read and item write endpoints from AsyncSession-based
+    # routes (asyncpg) instead of the threadpool + psycopg2 ones
+    USE_ASYNC_DATABASE: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    @validator("SQLALCHEMY_ASYNC_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(
+        cls, v: Optional[str], values: Dict[str, Any]
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        return str(values.get("SQLALCHEMY_DATABASE_URI")).replace(
+            "postgresql://", "postgresql+asyncpg://", 1
+        )
+
+    # Authenticated users are cached per process for this long; 0 disables the cache.
+    # Changes made through another worker are picked up after at most the TTL.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+
+    # The first scheme hashes new passwords; hashes using the others, or a rounds
+    # count other than PASSWORD_HASH_ROUNDS, are upgraded on the next login.
+    # Use `python app/calibrate_password_hash.py` to pick the rounds for a host.
+    PASSWORD_HASH_SCHEMES: List[str] = ["bcrypt"]
+    PASSWORD_HASH_ROUNDS: Optional[int] = None
+
+    # bcrypt runs in a per-worker process pool of this size (0 hashes inline); once
+    # PASSWORD_HASH_MAX_PENDING hashes are queued or running, new ones get a 503.
+    # Keep that below the request threadpool size (min(32, CPUs + 4)): sync callers
+    # hold a thread while they wait, and must leave some for other requests.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 4
+
+    # Upper bound on the number of rows accepted by a single bulk endpoint call
+    BULK_MAX_ITEMS: int = 1000
+    # Upper bound on the number of sub-requests in one POST /batch
+    BATCH_MAX_OPERATIONS: int = 20
+
+    # Debugging aid: report each response's SQL statement count and database time
+    # in X-DB-Query-Count / X-DB-Query-Time headers, and log statements run at
+    # least SQL_N_PLUS_ONE_THRESHOLD times with different parameters as N+1s
+    SQL_DEBUG: bool = False
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Statements slower than this (0 disables) are kept, with redacted parameters,
+    # the endpoint and an EXPLAIN plan, in a per-process ring buffer served by
+    # GET /utils/slow-queries/. SLOW_QUERY_EXPLAIN_ANALYZE re-runs CRUDBase's slow
+    # reads under EXPLAIN ANALYZE (in a rolled back transaction) for actual timings.
+    SLOW_QUERY_THRESHOLD_MS: float = 0
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN_ANALYZE: bool = False
+
+    # Serve list endpoints from plain column rows encoded with orjson, skipping
+    # per-row ORM loading and response model validation
+    USE_FAST_JSON_RESPONSES: bool = False
+
+    # Item change events buffered per GET /items/feed subscriber; when a client
+    # falls behind, its oldest events are dropped
+    ITEM_FEED_MAX_QUEUED: int = 100
+
+    # Port of the Prometheus endpoint of each Celery worker (None disables it); the
+    # API serves its metrics on /metrics. Set PROMETHEUS_MULTIPROC_DIR to an empty
+    # directory to aggregate over gunicorn workers or Celery pool processes.
+    WORKER_METRICS_PORT: Optional[int] = None
+
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
     SMTP_HOST: Optional[str] = None
@@ -67,6 +161,8 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
     EMAIL_TEMPLATES_DIR: str = "/app/app/email-templates/build"
+    # Re-read changed template files on send instead of caching them forever (dev)
+    EMAIL_TEMPLATES_AUTO_RELOAD: bool = False
     EMAILS_ENABLED: bool = False
 
     @validator("EMAILS_ENABLED", pre=True)
@@ -77,6 +173,14 @@ class Settings(BaseSettings):
             and values.get("EMAILS_FROM_EMAIL")
         )
 
+    # Newsletter fan-out: recipients per chunk task, SMTP connections kept open
+    # per worker process, and a rate limit in emails/second across all
+    # NEWSLETTER_SENDING_PROCESSES worker processes (0 means unlimited)
+    NEWSLETTER_CHUNK_SIZE: int = 1000
+    NEWSLETTER_SMTP_CONNECTIONS: int = 2
+    NEWSLETTER_RATE_LIMIT: float = 0
+    NEWSLETTER_SENDING_PROCESSES: int = 1
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"  # type: ignore
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -0,0 +1,151 @@
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Label for requests that matched no route, so unknown paths can't add series
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+TASK_RUNTIME = Histogram(
+    "celery_task_runtime_seconds", "Celery task run time", ["task"]
+)
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publishing a Celery task and a worker starting it",
+    ["task"],
+)
+TASK_FAILURES = Counter("celery_task_failures_total", "Failed Celery tasks", ["task"])
+
+
+def is_multiprocess() -> bool:
+    """
+    Whether metrics are aggregated over processes (gunicorn or Celery workers)
+    through the files in PROMETHEUS_MULTIPROC_DIR.
+    """
+    return bool(
+        os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        or os.environ.get("prometheus_multiproc_dir")
+    )
+
+
+def get_registry() -> CollectorRegistry:
+    if not is_multiprocess():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> bytes:
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    return generate_latest(get_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Drop the live gauges of a worker process that exited; call from its parent.
+    """
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+class PrometheusMiddleware:
+    """
+    Counts requests and records their latency per route template (e.g.
+    `/api/v1/items/{id}`), plus the requests in flight.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Optional[Dict[Callable, str]] = None
+
+    def route_path(self, scope: Scope) -> str:
+        # Routing sets the matched endpoint on this scope on its way down
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._route_paths is None:
+            routes = scope["app"].routes
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in routes
+                if isinstance(route, Route)
+            }
+        return self._route_paths.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            method, route = scope["method"], self.route_path(scope)
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, route, str(status)).inc()
+
+
+# Celery signal handlers; the publish one runs in the API, the others in workers
+
+PUBLISHED_AT_HEADER = "published_at"
+_task_started: Dict[str, float] = {}
+
+
+def on_task_publish(headers: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def on_task_prerun(task_id: str, task: Any, **kwargs: Any) -> None:
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        published_at = (task.request.headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at is not None:
+        wait = max(time.time() - float(published_at), 0)
+        TASK_QUEUE_WAIT.labels(task.name).observe(wait)
+
+
+def on_task_postrun(task_id: str, task: Any, **kwargs: Any) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.labels(task.name).observe(time.perf_counter() - started)
+
+
+def on_task_failure(sender: Any, **kwargs: Any) -> None:
+    TASK_FAILURES.labels(sender.name).inc()
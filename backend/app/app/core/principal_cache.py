@@ -0,0 +1,117 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Column values of a cached `User` row, keyed by column name
+Principal = Dict[str, Any]
+
+
+class PrincipalCacheBackend(ABC):
+    """
+    Storage for cached principals. Subclass it to share the cache between
+    processes (e.g. Redis); values are plain dicts so they serialize as-is.
+    """
+
+    @abstractmethod
+    def get(self, user_id: int) -> Optional[Principal]:
+        pass
+
+    @abstractmethod
+    def set(self, user_id: int, principal: Principal) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, user_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryPrincipalCacheBackend(PrincipalCacheBackend):
+    """
+    Per-process LRU with a TTL on every entry.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, user_id: int, principal: Principal) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class PrincipalCache:
+    def __init__(self, backend: Optional[PrincipalCacheBackend]):
+        """
+        Cache of authenticated users keyed by id, with hit/miss counters.
+
+        **Parameters**
+
+        * `backend`: Where entries are stored; `None` disables caching
+        """
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        principal = self.backend.get(user_id) if self.backend else None
+        with self._lock:
+            if principal is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return principal
+
+    def set(self, user_id: int, principal: Principal) -> None:
+        if self.backend:
+            self.backend.set(user_id, principal)
+
+    def invalidate(self, user_id: int) -> None:
+        if self.backend:
+            self.backend.delete(user_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(
+    InMemoryPrincipalCacheBackend(
+        max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+        ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+    if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0
+    else None
+)
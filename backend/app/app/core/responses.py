@@ -0,0 +1,53 @@
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from starlette.responses import JSONResponse, Response
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson, for content that is already plain data
+    (dicts, lists, scalars) and needs no `jsonable_encoder` pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def generate_etag(*parts: Any) -> str:
+    """
+    Weak ETag over the given parts, e.g. `(id, version)` pairs of a resource.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of `etag` against an `If-None-Match` header value.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        _opaque_tag(tag) == _opaque_tag(etag) for tag in if_none_match.split(",")
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Authenticated data: only the client may cache it, and must revalidate first
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
@@ -1,17 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def get_crypt_context(schemes: List[str], rounds: Optional[int] = None) -> CryptContext:
+    """
+    Build a context hashing with `schemes[0]` at exactly `rounds` (when given), so
+    that hashes with any other scheme or cost report `needs_update`.
+    """
+    options = {}
+    if rounds is not None:
+        for option in ("default_rounds", "min_rounds", "max_rounds"):
+            options[f"{schemes[0]}__{option}"] = rounds
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+pwd_context = get_crypt_context(
+    settings.PASSWORD_HASH_SCHEMES, settings.PASSWORD_HASH_ROUNDS
+)
 
 
 ALGORITHM = "HS256"
 
 
+class PasswordHasherBusy(Exception):
+    """
+    Raised when too many password hashes are already queued or running.
+    """
+
+
+_hasher: Optional[ProcessPoolExecutor] = None
+_hasher_lock = threading.Lock()
+_hasher_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_hasher() -> ProcessPoolExecutor:
+    global _hasher
+    # Created lazily so every gunicorn/celery worker gets its own pool after fork.
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        return _hasher
+
+
+def _submit(fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+    """
+    Run `fn` in the password hashing pool, or inline when the pool is disabled.
+    """
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        future: "Future[Any]" = Future()
+        future.set_result(fn(*args))
+        return future
+    if not _hasher_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = _get_hasher().submit(fn, *args)
+    except BaseException:
+        _hasher_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hasher_slots.release())
+    return future
+
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
@@ -27,8 +98,34 @@ def create_access_token(
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit(_verify, plain_password, hashed_password).result()
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _submit(_hash, password).result()
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify the password and, if its hash uses an outdated scheme or cost, also
+    return a fresh hash to store in place of the old one.
+    """
+    return _submit(_verify_and_update, plain_password, hashed_password).result()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit(_verify, plain_password, hashed_password))
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await asyncio.wrap_future(
+        _submit(_verify_and_update, plain_password, hashed_password)
+    )
@@ -1,3 +1,6 @@
+from .async_crud_item import async_item
+from .async_crud_user import async_user
+from .crud_issue import issue
 from .crud_item import item
 from .crud_user import user
 
@@ -0,0 +1,110 @@
+from typing import Any, Dict, Generic, List, Optional, Type, Union
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Column, select
+from sqlalchemy.engine.row import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CreateSchemaType, ModelType, UpdateSchemaType
+
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        AsyncSession counterpart of `CRUDBase`, with the same methods as coroutines.
+
+        **Parameters**
+
+        * `model`: A SQLAlchemy model class
+        """
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        query = select(self.model).where(self.model.id == id)  # type: ignore
+        result = await db.execute(query)
+        return result.scalars().first()
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[ModelType]:
+        query = select(self.model)  # type: ignore
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.order_by(self.model.id).limit(limit))
+        return result.scalars().all()
+
+    async def get_multi_rows(
+        self,
+        db: AsyncSession,
+        *,
+        columns: List[Column],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Row]:
+        query = select(*columns)  # type: ignore
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.order_by(self.model.id).limit(limit))
+        return result.all()
+
+    async def get_row(
+        self, db: AsyncSession, *, id: Any, columns: List[Column]
+    ) -> Optional[Row]:
+        query = select(*columns).where(self.model.id == id)  # type: ignore
+        result = await db.execute(query)
+        return result.first()
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)  # type: ignore
+        db.add(db_obj)
+        await self._on_change(db, "create", [db_obj])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await self._on_change(db, "update", [db_obj])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await self._on_change(db, "delete", [obj])
+        await db.commit()
+        return obj
+
+    async def _on_change(
+        self, db: AsyncSession, action: str, db_objs: List[ModelType]
+    ) -> None:
+        """
+        Like `CRUDBase._on_change`: called inside the transaction, right before
+        the commit, by every method that creates, updates or deletes rows.
+        """
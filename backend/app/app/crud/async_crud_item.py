@@ -0,0 +1,98 @@
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Column, select
+from sqlalchemy.engine.row import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.async_base import AsyncCRUDBase
+from app.crud.crud_item import (
+    ITEM_COUNT,
+    ITEM_COUNT_ESTIMATE,
+    item_change_statements,
+    owner_item_count,
+)
+from app.models.item import Item
+from app.schemas.item import ItemCreate, ItemUpdate
+
+
+class AsyncCRUDItem(AsyncCRUDBase[Item, ItemCreate, ItemUpdate]):
+    async def create_with_owner(
+        self, db: AsyncSession, *, obj_in: ItemCreate, owner_id: int
+    ) -> Item:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data, owner_id=owner_id)
+        db.add(db_obj)
+        await self._on_change(db, "create", [db_obj])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def get_multi_by_owner(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Item]:
+        query = select(self.model).where(Item.owner_id == owner_id)  # type: ignore
+        if after_id is not None:
+            query = query.where(Item.id > after_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.order_by(Item.id).limit(limit))
+        return result.scalars().all()
+
+    async def get_multi_rows_by_owner(
+        self,
+        db: AsyncSession,
+        *,
+        columns: List[Column],
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Row]:
+        query = select(*columns).where(Item.owner_id == owner_id)  # type: ignore
+        if after_id is not None:
+            query = query.where(Item.id > after_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.order_by(Item.id).limit(limit))
+        return result.all()
+
+    async def count_by_owner(self, db: AsyncSession, *, owner_id: int) -> int:
+        """
+        See `CRUDItem.count_by_owner`.
+        """
+        result = await db.execute(owner_item_count(owner_id))
+        return result.scalar() or 0
+
+    async def count(self, db: AsyncSession, *, exact: bool = False) -> int:
+        """
+        See `CRUDItem.count`.
+        """
+        if not exact:
+            estimate = (await db.execute(ITEM_COUNT_ESTIMATE)).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return (await db.execute(ITEM_COUNT)).scalar()
+
+    async def _on_change(
+        self, db: AsyncSession, action: str, db_objs: List[Item]
+    ) -> None:
+        """
+        Run `item_change_statements` for the change, like `CRUDItem._on_change`.
+        """
+        if not db_objs:
+            return
+        if action != "delete":
+            # New items only get their ids on flush
+            await db.flush()
+        for statement, parameters in item_change_statements(action, db_objs):
+            await db.execute(statement, parameters)
+
+
+async_item = AsyncCRUDItem(Item)
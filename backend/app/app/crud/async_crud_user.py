@@ -0,0 +1,73 @@
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.principal_cache import principal_cache
+from app.core.security import get_password_hash_async
+from app.crud.async_base import AsyncCRUDBase
+from app.crud.crud_user import principal_to_user, user_to_principal
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+
+
+class AsyncCRUDUser(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        query = select(User).where(User.email == email)  # type: ignore
+        result = await db.execute(query)
+        return result.scalars().first()
+
+    async def get_principal(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        """
+        Like `get`, but served from the principal cache when possible.
+
+        See `CRUDUser.get_principal`; a miss also releases the connection.
+        """
+        principal = principal_cache.get(id)
+        if principal is None:
+            user = await self.get(db, id=id)
+            if not user:
+                return None
+            principal = user_to_principal(user)
+            principal_cache.set(id, principal)
+            await db.rollback()
+        return await db.merge(principal_to_user(principal), load=False)
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        db_obj = User(
+            email=obj_in.email,
+            hashed_password=await get_password_hash_async(obj_in.password),
+            full_name=obj_in.full_name,
+            is_superuser=obj_in.is_superuser,
+        )
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            hashed_password = await get_password_hash_async(update_data["password"])
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        principal_cache.invalidate(user.id)
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: int) -> User:
+        user = await super().remove(db, id=id)
+        principal_cache.invalidate(id)
+        return user
+
+
+async_user = AsyncCRUDUser(User)
@@ -2,14 +2,20 @@ from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import Column, delete, insert, select
+from sqlalchemy.engine.row import Row
 from sqlalchemy.orm import Session
 
 from app.db.base_class import Base
+from app.db.session import replica_reads
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows per multi-VALUES INSERT; keeps bind parameters well under Postgres' limit.
+INSERT_CHUNK_SIZE = 1000
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -24,21 +30,81 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        query = db.query(self.model).filter(self.model.id == id)
+        # analyze_safe: the slow query log may re-run it under EXPLAIN ANALYZE
+        with replica_reads(db):
+            return query.execution_options(analyze_safe=True).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        query = self._paginate(
+            db.query(self.model), skip=skip, limit=limit, after_id=after_id
+        )
+        with replica_reads(db):
+            return query.execution_options(analyze_safe=True).all()
+
+    def get_multi_rows(
+        self,
+        db: Session,
+        *,
+        columns: List[Column],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Row]:
+        """
+        Like `get_multi`, but returns plain rows of `columns` instead of models.
+        """
+        # The SQLAlchemy stubs predate 1.4's select(*columns)
+        query = select(*columns)  # type: ignore
+        stmt = self._paginate(query, skip=skip, limit=limit, after_id=after_id)
+        with replica_reads(db):
+            return db.execute(stmt.execution_options(analyze_safe=True)).all()
+
+    def get_row(self, db: Session, *, id: Any, columns: List[Column]) -> Optional[Row]:
+        """
+        Like `get`, but returns a plain row of `columns` instead of a model.
+        """
+        query = select(*columns).where(self.model.id == id)  # type: ignore
+        with replica_reads(db):
+            return db.execute(query.execution_options(analyze_safe=True)).first()
+
+    def columns_for(
+        self, schema: Type[BaseModel], fields: Optional[List[str]] = None
+    ) -> List[Column]:
+        """
+        The table columns backing the fields of `schema` (only those named in
+        `fields`, if given), in field order.
+        """
+        return [
+            self.model.__table__.c[name]
+            for name in schema.__fields__
+            if fields is None or name in fields
+        ]
+
+    def get_multi_by_ids(self, db: Session, *, ids: List[int]) -> List[ModelType]:
+        return db.query(self.model).filter(self.model.id.in_(ids)).all()
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
+        self._on_change(db, "create", [db_obj])
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def create_multi(
+        self, db: Session, *, objs_in: List[CreateSchemaType]
+    ) -> List[ModelType]:
+        return self._insert_multi(db, [jsonable_encoder(obj_in) for obj_in in objs_in])
+
     def update(
         self,
         db: Session,
@@ -46,21 +112,107 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        self._apply_update(db_obj, obj_in)
         db.add(db_obj)
+        self._on_change(db, "update", [db_obj])
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def update_multi(
+        self,
+        db: Session,
+        *,
+        db_objs: List[ModelType],
+        objs_in: List[Union[UpdateSchemaType, Dict[str, Any]]]
+    ) -> List[ModelType]:
+        ids = [db_obj.id for db_obj in db_objs]
+        for db_obj, obj_in in zip(db_objs, objs_in):
+            self._apply_update(db_obj, obj_in)
+        db.add_all(db_objs)
+        self._on_change(db, "update", db_objs)
+        db.commit()
+        # A single SELECT repopulates every instance expired by the commit,
+        # instead of one refresh() round trip per row.
+        self.get_multi_by_ids(db, ids=ids)
+        return db_objs
+
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
+        self._on_change(db, "delete", [obj])
         db.commit()
         return obj
+
+    def remove_multi(self, db: Session, *, ids: List[int]) -> List[ModelType]:
+        """
+        Delete all rows with the given ids in one statement.
+
+        The returned objects are built from `DELETE ... RETURNING` and are not
+        attached to the session.
+        """
+        db_objs = self._delete_multi(db, ids)
+        self._on_change(db, "delete", db_objs)
+        db.commit()
+        return db_objs
+
+    def _on_change(self, db: Session, action: str, db_objs: List[ModelType]) -> None:
+        """
+        Called inside the transaction, right before the commit, by every method
+        that creates ("create"), updates ("update") or deletes ("delete") rows.
+        """
+
+    def _apply_update(
+        self, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> None:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+
+    def _paginate(
+        self, query: Any, *, skip: int, limit: int, after_id: Optional[int]
+    ) -> Any:
+        """
+        Apply id-ordered paging to an ORM query or Core select.
+        """
+        query = query.order_by(self.model.id)
+        if after_id is not None:
+            # Keyset paging: seek past the last seen id instead of scanning and
+            # discarding `skip` rows.
+            query = query.filter(self.model.id > after_id)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    def _delete_multi(self, db: Session, ids: List[int]) -> List[ModelType]:
+        table = self.model.__table__
+        result = db.execute(
+            delete(table).where(table.c.id.in_(ids)).returning(*table.c)
+        )
+        return [self.model(**row._mapping) for row in result]  # type: ignore
+
+    def _insert_multi(self, db: Session, rows: List[Dict[str, Any]]) -> List[ModelType]:
+        """
+        Insert `rows` with multi-VALUES `INSERT ... RETURNING` in one transaction.
+
+        The returned objects are built from the returned rows and are not
+        attached to the session.
+        """
+        table = self.model.__table__
+        db_objs: List[ModelType] = []
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            end = start + INSERT_CHUNK_SIZE
+            result = db.execute(
+                insert(table).values(rows[start:end]).returning(*table.c)
+            )
+            db_objs.extend(
+                self.model(**row._mapping) for row in result  # type: ignore
+            )
+        self._on_change(db, "create", db_objs)
+        db.commit()
+        return db_objs
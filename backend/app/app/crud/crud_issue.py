@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.issue import Issue
+from app.models.issue_chunk import IssueChunk
+from app.models.user import User
+from app.schemas.issue import IssueCreate, IssueUpdate
+
+# First key of the advisory locks serializing chunk creation per issue
+ISSUE_LOCK_CLASS = 0x6E6D
+
+
+class CRUDIssue(CRUDBase[Issue, IssueCreate, IssueUpdate]):
+    def mark_sent(self, db: Session, *, db_obj: Issue) -> Issue:
+        db_obj.sent_at = datetime.utcnow()
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def create_chunks(
+        self, db: Session, *, issue_id: int, chunk_size: int
+    ) -> List[IssueChunk]:
+        """
+        Split the active users into chunks of `chunk_size` consecutive ids.
+
+        Users are streamed by keyset, one chunk per transaction. Each chunk
+        starts after the last one stored for the issue (under a per-issue lock),
+        so an interrupted or concurrent run never creates overlapping chunks.
+        """
+        chunks = []
+        while True:
+            db.execute(select(func.pg_advisory_xact_lock(ISSUE_LOCK_CLASS, issue_id)))
+            last_user_id = (
+                db.query(func.max(IssueChunk.last_user_id))
+                .filter(IssueChunk.issue_id == issue_id)
+                .scalar()
+            ) or 0
+            user_ids = [
+                row.id
+                for row in db.query(User.id)
+                .filter(User.is_active.is_(True), User.id > last_user_id)
+                .order_by(User.id)
+                .limit(chunk_size)
+            ]
+            if not user_ids:
+                db.commit()
+                break
+            chunk = IssueChunk(
+                issue_id=issue_id,
+                first_user_id=user_ids[0],
+                last_user_id=user_ids[-1],
+                sent_through_user_id=user_ids[0] - 1,
+                recipient_count=len(user_ids),
+                sent_count=0,
+            )
+            db.add(chunk)
+            db.commit()
+            chunks.append(chunk)
+        return chunks
+
+    def get_incomplete_chunks(self, db: Session, *, issue_id: int) -> List[IssueChunk]:
+        return (
+            db.query(IssueChunk)
+            .filter(IssueChunk.issue_id == issue_id, IssueChunk.completed_at.is_(None))
+            .order_by(IssueChunk.id)
+            .all()
+        )
+
+    def get_progress(self, db: Session, *, issue_id: int) -> Dict[str, int]:
+        recipients, sent, chunks, chunks_completed = (
+            db.query(
+                func.coalesce(func.sum(IssueChunk.recipient_count), 0),
+                func.coalesce(func.sum(IssueChunk.sent_count), 0),
+                func.count(IssueChunk.id),
+                func.count(IssueChunk.completed_at),
+            )
+            .filter(IssueChunk.issue_id == issue_id)
+            .one()
+        )
+        return {
+            "recipients": recipients,
+            "sent": sent,
+            "chunks": chunks,
+            "chunks_completed": chunks_completed,
+        }
+
+
+issue = CRUDIssue(Issue)
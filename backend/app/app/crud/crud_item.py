@@ -1,12 +1,98 @@
-from typing import List
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import (
+    REAL,
+    Column,
+    cast,
+    false,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    text,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine.row import Row
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select, Update
+from sqlalchemy.sql.base import Executable
 
 from app.crud.base import CRUDBase
+from app.db.session import replica_reads
 from app.models.item import Item
+from app.models.item_tombstone import ItemTombstone
+from app.models.user import User
 from app.schemas.item import ItemCreate, ItemUpdate
 
+ITEM_CHANGES_CHANNEL = "item_changes"
+# Item ids per NOTIFY, keeping payloads under Postgres' 8000 byte limit
+NOTIFY_CHUNK_SIZE = 500
+# Row count estimate from the last ANALYZE; -1 if the table was never analyzed
+ITEM_COUNT_ESTIMATE = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = 'item'::regclass"
+)
+ITEM_COUNT = select(func.count()).select_from(Item.__table__)
+
+
+def owner_item_count(owner_id: int) -> Select:
+    """
+    Query for an owner's `User.item_count`.
+    """
+    return select(User.item_count).where(User.id == owner_id)  # type: ignore
+
+
+def item_count_update(owner_id: int, delta: int) -> Update:
+    """
+    Statement adjusting an owner's `User.item_count` by `delta`.
+    """
+    # The count isn't part of the user resource, so keep its version (and ETag)
+    return (
+        update(User.__table__)
+        .where(User.id == owner_id)
+        .values(item_count=User.item_count + delta, version=User.version)
+    )
+
+
+def item_change_statements(
+    action: str, db_objs: List[Item]
+) -> List[Tuple[Executable, Optional[List[Dict[str, Any]]]]]:
+    """
+    `(statement, parameters)` pairs recording a change to `db_objs`: tombstones
+    for deleted items, the owners' item count adjustments and a NOTIFY per owner
+    on `ITEM_CHANGES_CHANNEL` (Postgres delivers it only if the commit succeeds).
+
+    Shared by `CRUDItem` and `AsyncCRUDItem`, which run them in the changing
+    transaction, after a flush has given new items their ids.
+    """
+    statements: List[Tuple[Executable, Optional[List[Dict[str, Any]]]]] = []
+    if action == "delete":
+        tombstones = [{"id": obj.id, "owner_id": obj.owner_id} for obj in db_objs]
+        statements.append((insert(ItemTombstone.__table__), tombstones))
+    ids_by_owner: Dict[int, List[int]] = defaultdict(list)
+    for obj in db_objs:
+        # Ownerless items have no count to keep nor subscribers to tell
+        if obj.owner_id is not None:
+            ids_by_owner[obj.owner_id].append(obj.id)
+    # Sorted, so concurrent writers lock the owners' rows in the same order
+    for owner_id, ids in sorted(ids_by_owner.items()):
+        if action != "update":
+            delta = len(ids) if action == "create" else -len(ids)
+            statements.append((item_count_update(owner_id, delta), None))
+        for start in range(0, len(ids), NOTIFY_CHUNK_SIZE):
+            end = start + NOTIFY_CHUNK_SIZE
+            payload = json.dumps(
+                {"action": action, "owner_id": owner_id, "ids": ids[start:end]}
+            )
+            notify = select(func.pg_notify(ITEM_CHANGES_CHANNEL, payload))
+            statements.append((notify, None))
+    return statements
+
 
 class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
     def create_with_owner(
@@ -15,20 +101,181 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data, owner_id=owner_id)
         db.add(db_obj)
+        self._on_change(db, "create", [db_obj])
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def create_multi_with_owner(
+        self, db: Session, *, objs_in: List[ItemCreate], owner_id: int
+    ) -> List[Item]:
+        rows = [dict(jsonable_encoder(obj_in), owner_id=owner_id) for obj_in in objs_in]
+        return self._insert_multi(db, rows)
+
     def get_multi_by_owner(
-        self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[Item]:
-        return (
-            db.query(self.model)
-            .filter(Item.owner_id == owner_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        query = self._paginate(
+            db.query(self.model).filter(Item.owner_id == owner_id),
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+        )
+        with replica_reads(db):
+            return query.execution_options(analyze_safe=True).all()
+
+    def get_multi_rows_by_owner(
+        self,
+        db: Session,
+        *,
+        columns: List[Column],
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Row]:
+        stmt = self._paginate(
+            select(*columns).where(Item.owner_id == owner_id),  # type: ignore
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
         )
+        with replica_reads(db):
+            return db.execute(stmt.execution_options(analyze_safe=True)).all()
+
+    def iter_rows(
+        self, db: Session, *, owner_id: Optional[int] = None, batch_size: int = 1000
+    ) -> Iterator[Row]:
+        """
+        Stream `(id, title, description, owner_id)` rows in id order from a
+        server-side cursor, `batch_size` rows at a time, without building `Item`s.
+        """
+        query = db.query(Item.id, Item.title, Item.description, Item.owner_id)
+        if owner_id is not None:
+            query = query.filter(Item.owner_id == owner_id)
+        return iter(query.order_by(Item.id).yield_per(batch_size))
+
+    def count_by_owner(self, db: Session, *, owner_id: int) -> int:
+        """
+        Number of items owned by `owner_id`, read from the user's counter cache.
+        """
+        count = db.execute(owner_item_count(owner_id)).scalar()
+        return count or 0
+
+    def count(self, db: Session, *, exact: bool = False) -> int:
+        """
+        Number of items: the planner's estimate from the last ANALYZE, unless
+        `exact` (or the table was never analyzed), in which case a full COUNT.
+        """
+        if not exact:
+            estimate = db.execute(ITEM_COUNT_ESTIMATE).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return db.execute(ITEM_COUNT).scalar()
+
+    def get_changes(
+        self,
+        db: Session,
+        *,
+        owner_id: Optional[int] = None,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = 100
+    ) -> List[Row]:
+        """
+        Items written and deleted since `after`, in commit-safe change order.
+
+        Each row has the item's columns plus `changed_txid` and `deleted`
+        (tombstones carry only `id` and `owner_id`). Pass the last row's
+        `(changed_txid, id)` as `after` to continue.
+
+        Only changes by transactions older than every transaction still in
+        progress are returned: a slow writer can't commit a change that sorts
+        before a position a client has already read past.
+        """
+        horizon = db.execute(
+            select(func.txid_snapshot_xmin(func.txid_current_snapshot()))
+        ).scalar()
+        written_columns = [
+            Item.id,
+            Item.owner_id,
+            Item.title,
+            Item.description,
+            Item.changed_txid,
+            false().label("deleted"),
+        ]
+        deleted_columns = [
+            ItemTombstone.id,
+            ItemTombstone.owner_id,
+            null().label("title"),
+            null().label("description"),
+            ItemTombstone.changed_txid,
+            true().label("deleted"),
+        ]
+        # The SQLAlchemy stubs predate 1.4's select(*columns)
+        written = select(*written_columns)  # type: ignore
+        deleted = select(*deleted_columns)  # type: ignore
+        written = written.where(Item.changed_txid < horizon)
+        deleted = deleted.where(ItemTombstone.changed_txid < horizon)
+        if owner_id is not None:
+            written = written.where(Item.owner_id == owner_id)
+            deleted = deleted.where(ItemTombstone.owner_id == owner_id)
+        if after is not None:
+            after_key = tuple_(literal(after[0]), literal(after[1]))
+            written = written.where(tuple_(Item.changed_txid, Item.id) > after_key)
+            deleted = deleted.where(
+                tuple_(ItemTombstone.changed_txid, ItemTombstone.id) > after_key
+            )
+        changes = written.union_all(deleted).subquery()  # type: ignore
+        stmt = select(changes).order_by(changes.c.changed_txid, changes.c.id)
+        return db.execute(stmt.limit(limit)).all()
+
+    def search(
+        self,
+        db: Session,
+        *,
+        q: str,
+        owner_id: Optional[int] = None,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[Item, float]]:
+        """
+        Full-text search over item titles and descriptions, best matches first.
+
+        **Parameters**
+
+        * `q`: Search terms, in web search syntax ("quoted phrases", -exclusions, or)
+        * `owner_id`: Only search the items owned by this user
+        * `after`: `(rank, id)` of the last result of the previous page
+        """
+        query = func.websearch_to_tsquery("english", q)
+        rank = func.ts_rank_cd(Item.search_vector, query).label("rank")
+        stmt = db.query(self.model, rank).filter(Item.search_vector.op("@@")(query))
+        if owner_id is not None:
+            stmt = stmt.filter(Item.owner_id == owner_id)
+        if after is not None:
+            after_rank, after_id = after
+            # ts_rank_cd returns a float4; compare in float4 so ties stay exact
+            after_key = tuple_(cast(after_rank, REAL), literal(after_id))
+            stmt = stmt.filter(tuple_(rank, Item.id) < after_key)
+        return stmt.order_by(rank.desc(), Item.id.desc()).limit(limit).all()
+
+    def _on_change(self, db: Session, action: str, db_objs: List[Item]) -> None:
+        """
+        Run `item_change_statements` for the change.
+        """
+        if not db_objs:
+            return
+        if action != "delete":
+            # New items only get their ids on flush
+            db.flush()
+        for statement, parameters in item_change_statements(action, db_objs):
+            db.execute(statement, parameters)
 
 
 item = CRUDItem(Item)
@@ -1,21 +1,77 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password
+from app.core.principal_cache import Principal, principal_cache
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
 
+def user_to_principal(user: User) -> Principal:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def principal_to_user(principal: Principal) -> User:
+    """
+    Rebuild a `User` from its cached column values as a detached instance, so it
+    can be merged into a session without a SELECT and updated like a loaded one.
+    """
+    user = User(**principal)
+    make_transient_to_detached(user)
+    return user
+
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
+    def get_principal(self, db: Session, *, id: int) -> Optional[User]:
+        """
+        Like `get`, but served from the principal cache when possible.
+
+        On a miss the read transaction is rolled back once the row is cached, so
+        the session gives its connection back to the pool until the next query.
+        Only call this before anything else has been done with `db`.
+        """
+        principal = principal_cache.get(id)
+        if principal is None:
+            # From the primary, not `get`'s replica: a lagging replica would cache
+            # a stale (e.g. still active) principal for the whole TTL
+            user = db.query(User).filter(User.id == id).first()
+            if not user:
+                return None
+            principal = user_to_principal(user)
+            principal_cache.set(id, principal)
+            db.rollback()
+        return db.merge(principal_to_user(principal), load=False)
+
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
+        return self._create(
+            db, obj_in=obj_in, hashed_password=get_password_hash(obj_in.password)
+        )
+
+    async def create_async(self, db: Session, *, obj_in: UserCreate) -> User:
+        """
+        `create` for async endpoints: no thread is held while the password is
+        hashed, and the queries run in the threadpool.
+        """
+        hashed_password = await get_password_hash_async(obj_in.password)
+        return await run_in_threadpool(
+            self._create, db, obj_in=obj_in, hashed_password=hashed_password
+        )
+
+    def _create(self, db: Session, *, obj_in: UserCreate, hashed_password: str) -> User:
         db_obj = User(
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password,
             full_name=obj_in.full_name,
             is_superuser=obj_in.is_superuser,
         )
@@ -31,20 +87,94 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        if update_data["password"]:
+        if update_data.get("password"):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        principal_cache.invalidate(user.id)
+        return user
+
+    async def update_async(
+        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        """
+        `update` for async endpoints, see `create_async`.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            hashed_password = await get_password_hash_async(update_data["password"])
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+        return await run_in_threadpool(
+            self.update, db, db_obj=db_obj, obj_in=update_data
+        )
+
+    def update_multi(
+        self,
+        db: Session,
+        *,
+        db_objs: List[User],
+        objs_in: List[Union[UserUpdate, Dict[str, Any]]]
+    ) -> List[User]:
+        users = super().update_multi(db, db_objs=db_objs, objs_in=objs_in)
+        for user in users:
+            principal_cache.invalidate(user.id)
+        return users
+
+    def remove(self, db: Session, *, id: int) -> User:
+        user = super().remove(db, id=id)
+        principal_cache.invalidate(id)
+        return user
+
+    def remove_multi(self, db: Session, *, ids: List[int]) -> List[User]:
+        users = super().remove_multi(db, ids=ids)
+        for id in ids:
+            principal_cache.invalidate(id)
+        return users
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            self.set_password_hash(db, user=user, hashed_password=new_hash)
         return user
 
+    async def authenticate_async(
+        self, db: Session, *, email: str, password: str
+    ) -> Optional[User]:
+        """
+        `authenticate` for async endpoints, see `create_async`.
+        """
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await verify_and_update_password_async(
+            password, user.hashed_password
+        )
+        if not valid:
+            return None
+        if new_hash:
+            await run_in_threadpool(
+                self.set_password_hash, db, user=user, hashed_password=new_hash
+            )
+        return user
+
+    def set_password_hash(
+        self, db: Session, *, user: User, hashed_password: str
+    ) -> None:
+        user.hashed_password = hashed_password
+        db.add(user)
+        db.commit()
+        principal_cache.invalidate(user.id)
+
     def is_active(self, user: User) -> bool:
         return user.is_active
 
@@ -1,5 +1,8 @@
 # Import all the models, so that Base has them before being
 # imported by Alembic
 from app.db.base_class import Base  # noqa
+from app.models.issue import Issue  # noqa
+from app.models.issue_chunk import IssueChunk  # noqa
 from app.models.item import Item  # noqa
+from app.models.item_tombstone import ItemTombstone  # noqa
 from app.models.user import User  # noqa
@@ -1,11 +1,13 @@
 from typing import Any
 
+from sqlalchemy import Table
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
 
 @as_declarative()
 class Base:
     id: Any
+    __table__: Table
     __name__: str
     # Generate __tablename__ automatically
     @declared_attr
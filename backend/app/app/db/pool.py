@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Any, Dict
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+# Key of a connection's checkout time in its `ConnectionRecord.info`
+CHECKOUT_TIME_KEY = "pool_metrics_checkout_time"
+
+_engine_metrics: "WeakKeyDictionary[Engine, PoolMetrics]" = WeakKeyDictionary()
+
+
+class PoolMetrics:
+    """
+    Counters of one engine's connection pool, kept when the pool is recreated.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.connects = 0
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_checkin(self, held: float) -> None:
+        with self._lock:
+            self.hold_seconds_total += held
+            self.hold_seconds_max = max(self.hold_seconds_max, held)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "hold_seconds_total": self.hold_seconds_total,
+                "hold_seconds_max": self.hold_seconds_max,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """
+    Count the checkouts and new connections of `engine`'s pool, and time how long
+    connections are held, through the pool's events.
+
+    The listeners are registered on the engine, so they move over to the pool
+    `engine.dispose()` replaces it with.
+    """
+    metrics = _engine_metrics[engine] = PoolMetrics()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.record_connect()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(
+        dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        connection_record.info[CHECKOUT_TIME_KEY] = time.perf_counter()
+        pool = engine.pool
+        metrics.record_checkout(pool.checkedout() if isinstance(pool, QueuePool) else 0)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        checked_out_at = connection_record.info.pop(CHECKOUT_TIME_KEY, None)
+        if checked_out_at is not None:
+            metrics.record_checkin(time.perf_counter() - checked_out_at)
+
+    return engine
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Live occupancy of `engine`'s pool (for queue pools) plus its counters.
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    metrics = _engine_metrics.get(engine)
+    if metrics is not None:
+        status.update(metrics.stats())
+    return status
@@ -0,0 +1,125 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time"
+
+
+class QueryStats:
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        """
+        Statements executed while tracking, with their total database time.
+
+        **Parameters**
+
+        * `parent`: Stats of an enclosing block (e.g. a batch around its
+          sub-requests), which is credited with these statements too
+        """
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        # Executions per statement text
+        self.executions: Dict[str, int] = {}
+        self._parameters: Dict[str, Set[int]] = {}
+
+    def record(self, statement: str, parameters: Any, duration: float) -> None:
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.executions[statement] = stats.executions.get(statement, 0) + 1
+            stats._parameters.setdefault(statement, set()).add(hash(repr(parameters)))
+            stats = stats.parent
+
+    def n_plus_one_suspects(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statements run at least `threshold` times with differing parameters, the
+        signature of a query issued once per row of an earlier result.
+        """
+        return [
+            (statement, executions)
+            for statement, executions in self.executions.items()
+            if executions >= threshold and len(self._parameters[statement]) > 1
+        ]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect the statements executed by this context (and the tasks and threadpool
+    calls it starts) in the block, on every engine.
+    """
+    stats = QueryStats(_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    if _current_stats.get() is not None:
+        conn.info["query_start_time"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    stats = _current_stats.get()
+    start_time = conn.info.pop("query_start_time", None)
+    if stats is not None and start_time is not None:
+        stats.record(statement, parameters, time.perf_counter() - start_time)
+
+
+class QueryStatsMiddleware:
+    """
+    Reports each request's statement count and database time (in ms) in
+    response headers, and logs its N+1 suspects.
+    """
+
+    def __init__(self, app: ASGIApp, *, n_plus_one_threshold: int):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers[QUERY_TIME_HEADER] = f"{stats.duration * 1000:.1f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        for statement, executions in stats.n_plus_one_suspects(
+            self.n_plus_one_threshold
+        ):
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: "
+                f"{executions} executions of {statement!r}"
+            )
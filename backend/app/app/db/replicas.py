@@ -0,0 +1,76 @@
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed
+# everything it received (an idle primary otherwise looks like growing lag).
+REPLICATION_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class Replica:
+    def __init__(self, engine: Engine, *, max_lag: float, check_interval: float):
+        """
+        A read replica whose replication lag is re-checked at most once per
+        `check_interval` seconds.
+
+        **Parameters**
+
+        * `engine`: Engine (and connection pool) of the replica
+        * `max_lag`: Seconds of lag beyond which the replica isn't used
+        * `check_interval`: Seconds a lag measurement is trusted for
+        """
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def measure_lag(self) -> Optional[float]:
+        try:
+            with self.engine.connect() as conn:
+                return float(conn.execute(REPLICATION_LAG_QUERY).scalar() or 0)
+        except DBAPIError as e:
+            logger.warning(f"Can't check replica {self.engine.url!r}: {e}")
+            return None
+
+    def is_healthy(self) -> bool:
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self.lag = self.measure_lag()
+                self._checked_at = time.monotonic()
+            return self.lag is not None and self.lag <= self.max_lag
+
+
+class ReplicaPool:
+    def __init__(self, replicas: List[Replica]):
+        """
+        Round-robin over the replicas that are currently healthy.
+        """
+        self.replicas = replicas
+        self._next = itertools.cycle(range(len(replicas) or 1))
+
+    def choose(self) -> Optional[Engine]:
+        """
+        The engine of the next healthy replica, or None to use the primary.
+        """
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.is_healthy():
+                return replica.engine
+        return None
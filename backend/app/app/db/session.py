@@ -1,7 +1,138 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.core.config import settings
+from app.db.pool import instrument_engine
+from app.db.replicas import Replica, ReplicaPool
+
+
+def engine_options(*, is_async: bool = False) -> Dict[str, Any]:
+    """
+    `create_engine` arguments for the pool and connection settings in `Settings`.
+    """
+    if settings.DB_USE_PGBOUNCER:
+        # PgBouncer does the pooling; asyncpg's named prepared statements would
+        # end up on server connections other than the one that prepared them
+        connect_args: Dict[str, Any] = {}
+        if is_async:
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        return {"poolclass": NullPool, "connect_args": connect_args}
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+
+# values_plus_batch lets psycopg2 send executemany() UPDATEs (e.g. from
+# CRUDBase.update_multi) in pages instead of one round trip per row.
+engine = instrument_engine(
+    create_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        executemany_mode="values_plus_batch",
+        **engine_options(),
+    )
+)
+
+replica_pool = ReplicaPool(
+    [
+        Replica(
+            instrument_engine(create_engine(uri, **engine_options())),
+            max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+            check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+        )
+        for uri in settings.SQLALCHEMY_REPLICA_URIS
+    ]
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the SELECTs made inside `replica_reads` to a replica, as
+    long as it hasn't written anything yet; after its first write every query
+    goes to the primary, so a request reads its own writes. Everything else,
+    flushes included, always goes to the primary.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replica_reads = False
+        self.wrote = False
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        if isinstance(clause, UpdateBase):
+            self.wrote = True
+        elif (
+            self.replica_reads
+            and isinstance(clause, Select)
+            and not self.wrote
+            and self.bind is engine
+        ):
+            replica = replica_pool.choose()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause, **kwargs)  # type: ignore
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush_as_write(session: RoutingSession, flush_context: Any) -> None:
+    session.wrote = True
+
+
+@contextmanager
+def replica_reads(db: Session) -> Iterator[None]:
+    """
+    Let the queries made by `db` in this block go to a read replica.
+    """
+    if not isinstance(db, RoutingSession) or db.replica_reads:
+        yield
+        return
+    db.replica_reads = True
+    try:
+        yield
+    finally:
+        db.replica_reads = False
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
+
+
+def async_session_factory(bind: AsyncEngine) -> sessionmaker:
+    # Async sessions can't lazy-load expired attributes, so keep them after commit.
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        class_=AsyncSession,
+        bind=bind,
+    )
+
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Only the async routes use these, and they are mounted only when enabled
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[sessionmaker] = None
+if settings.USE_ASYNC_DATABASE:
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI, **engine_options(is_async=True)
+    )
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_session_factory(async_engine)
@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Slow statements waiting for their EXPLAIN beyond this are logged without a plan
+MAX_PENDING_EXPLAINS = 10
+# Execution option marking CRUDBase's plain reads. Only these are re-run by
+# EXPLAIN ANALYZE: other SELECTs may call volatile functions (pg_notify,
+# pg_try_advisory_lock, ...) whose effects would happen a second time.
+ANALYZE_SAFE_OPTION = "analyze_safe"
+
+_current_request: ContextVar[Optional[Scope]] = ContextVar(
+    "slow_query_request", default=None
+)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    The bound parameters with each value replaced by its type name.
+    """
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def describe_endpoint(scope: Optional[Scope]) -> Optional[str]:
+    if scope is None:
+        return None
+    description = f"{scope['method']} {scope['path']}"
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        description += f" ({endpoint.__name__})"
+    return description
+
+
+class SlowQueryLog:
+    def __init__(self, *, max_entries: int):
+        """
+        Ring buffer of the most recent slow statements, each with the EXPLAIN
+        plan captured in a background thread.
+
+        **Parameters**
+
+        * `max_entries`: Entries kept; older ones are dropped
+        """
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="slow-query-explain"
+        )
+        self._pending = 0
+
+    def record(
+        self,
+        conn: Connection,
+        *,
+        statement: str,
+        parameters: Any,
+        duration: float,
+        endpoint: Optional[str],
+        analyze_safe: bool = False,
+    ) -> None:
+        entry = {
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "duration_ms": round(duration * 1000, 1),
+            "endpoint": endpoint,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+        }
+        logger.warning(
+            f"Slow query ({entry['duration_ms']} ms) in {endpoint}: {statement!r}"
+        )
+        with self._lock:
+            self._entries.append(entry)
+            # asyncpg statements can't be replayed through a sync connection
+            if conn.dialect.is_async or self._pending >= MAX_PENDING_EXPLAINS:
+                return
+            self._pending += 1
+        analyze = settings.SLOW_QUERY_EXPLAIN_ANALYZE and analyze_safe
+        self._executor.submit(
+            self._explain, conn.engine, entry, statement, parameters, analyze
+        )
+
+    def _explain(
+        self,
+        engine: Engine,
+        entry: Dict[str, Any],
+        statement: str,
+        parameters: Any,
+        analyze: bool,
+    ) -> None:
+        options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+        try:
+            with engine.connect() as conn:
+                # ANALYZE runs the statement again; never let that commit
+                trans = conn.begin()
+                try:
+                    plan = conn.exec_driver_sql(
+                        f"EXPLAIN ({options}) {statement}", parameters
+                    ).scalar()
+                finally:
+                    trans.rollback()
+            entry["plan"] = plan
+        except DBAPIError as e:
+            logger.warning(f"Can't explain slow query {statement!r}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(max_entries=settings.SLOW_QUERY_LOG_SIZE)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_slow_query_timer(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        conn.info["slow_query_start_time"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _check_slow_query(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    # Popped here, so a statement that failed doesn't leave a stale start time
+    start_time = conn.info.pop("slow_query_start_time", None)
+    if start_time is None:
+        return
+    duration = time.perf_counter() - start_time
+    if (
+        many
+        or duration * 1000 < settings.SLOW_QUERY_THRESHOLD_MS
+        or statement.lstrip().upper().startswith("EXPLAIN")
+    ):
+        return
+    slow_query_log.record(
+        conn,
+        statement=statement,
+        parameters=parameters,
+        duration=duration,
+        endpoint=describe_endpoint(_current_request.get()),
+        analyze_safe=bool(
+            context is not None and context.execution_options.get(ANALYZE_SAFE_OPTION)
+        ),
+    )
+
+
+class SlowQueryMiddleware:
+    """
+    Makes the current request known to the slow query log.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Routing adds the endpoint to this same scope dict further down the stack
+        token = _current_request.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+import asyncpg
+
+from app.core.config import settings
+from app.crud.crud_item import ITEM_CHANGES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before reconnecting a lost listener connection
+RECONNECT_DELAY = 1.0
+
+
+class Subscription:
+    def __init__(self, owner_id: Optional[int], max_queued: int):
+        """
+        One subscriber's bounded queue of item change events.
+
+        **Parameters**
+
+        * `owner_id`: Only receive changes to this user's items; None for all
+        * `max_queued`: Events kept for a slow reader; older ones are dropped
+        """
+        self.owner_id = owner_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(max_queued)
+        self.dropped = 0
+
+    def put(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class ItemChangeFeed:
+    def __init__(self, dsn: str, *, max_queued: int):
+        """
+        Fans out NOTIFYs from `CRUDItem` to the subscribers of this process, over
+        a single LISTEN connection.
+
+        **Parameters**
+
+        * `dsn`: Postgres connection string for the listener connection
+        * `max_queued`: Queue bound of each subscription
+        """
+        self.dsn = dsn
+        self.max_queued = max_queued
+        self._subscriptions: Set[Subscription] = set()
+        self._task: Optional["asyncio.Task[None]"] = None
+        # Set while the LISTEN is active; created by `start`, on the serving loop
+        self.listening: asyncio.Event
+
+    def subscribe(self, owner_id: Optional[int]) -> Subscription:
+        subscription = Subscription(owner_id, self.max_queued)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        for subscription in self._subscriptions:
+            if subscription.owner_id in (None, event["owner_id"]):
+                subscription.put(event)
+
+    def publish_all(self, event: Dict[str, Any]) -> None:
+        for subscription in self._subscriptions:
+            subscription.put(event)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self.listening = asyncio.Event()
+            self._task = asyncio.get_event_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed item change payload: {payload!r}")
+            return
+        self.publish(event)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Item change listener can't connect: {e!r}")
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda conn: lost.set())
+            try:
+                await conn.add_listener(ITEM_CHANGES_CHANNEL, self._on_notify)
+                self.listening.set()
+                await lost.wait()
+                logger.warning("Item change listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Item change listener failed: {e!r}")
+            finally:
+                self.listening.clear()
+                if not conn.is_closed():
+                    await conn.close()
+            # NOTIFYs sent while disconnected are lost; tell every subscriber to
+            # catch up through GET /items/changes.
+            self.publish_all({"action": "resync"})
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+item_feed = ItemChangeFeed(
+    str(settings.SQLALCHEMY_DATABASE_URI), max_queued=settings.ITEM_FEED_MAX_QUEUED
+)
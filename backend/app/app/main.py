@@ -1,13 +1,33 @@
 from fastapi import FastAPI
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.core.metrics import PrometheusMiddleware, render_metrics
+from app.core.security import PasswordHasherBusy
+from app.db.query_stats import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    QueryStatsMiddleware,
+)
+from app.db.slow_queries import SlowQueryMiddleware
+from app.item_feed import item_feed
 
 app = FastAPI(
     title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+if settings.SQL_DEBUG:
+    app.add_middleware(
+        QueryStatsMiddleware, n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD
+    )
+
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    app.add_middleware(SlowQueryMiddleware)
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -16,6 +36,40 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"]
+        + ([QUERY_COUNT_HEADER, QUERY_TIME_HEADER] if settings.SQL_DEBUG else []),
     )
 
+app.add_middleware(PrometheusMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+# Not under API_V1_STR, so the proxy doesn't route it; scrape the containers directly
+@app.get("/metrics", include_in_schema=False)
+def read_metrics() -> Response:
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.on_event("startup")
+async def start_item_feed() -> None:
+    # LISTEN needs a session-level connection, which PgBouncer's transaction
+    # pooling doesn't give
+    if not settings.DB_USE_PGBOUNCER:
+        await item_feed.start()
+
+
+@app.on_event("shutdown")
+async def stop_item_feed() -> None:
+    await item_feed.stop()
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(
+    request: Request, exc: PasswordHasherBusy
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password operations in progress"},
+        headers={"Retry-After": "1"},
+    )
@@ -1,2 +1,5 @@
+from .issue import Issue
+from .issue_chunk import IssueChunk
 from .item import Item
+from .item_tombstone import ItemTombstone
 from .user import User
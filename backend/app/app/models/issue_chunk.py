@@ -0,0 +1,28 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+if TYPE_CHECKING:
+    from .issue import Issue  # noqa: F401
+
+
+class IssueChunk(Base):
+    """
+    A contiguous range of recipient user ids for one issue, sent by one task.
+
+    `sent_through_user_id` is committed after every delivered email, so a
+    restarted task resumes right after the last recipient it reached.
+    """
+
+    id = Column(Integer, primary_key=True, index=True)
+    issue_id = Column(Integer, ForeignKey("issue.id"), nullable=False, index=True)
+    first_user_id = Column(Integer, nullable=False)
+    last_user_id = Column(Integer, nullable=False)
+    sent_through_user_id = Column(Integer, nullable=False)
+    recipient_count = Column(Integer, nullable=False)
+    sent_count = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime)
+    issue = relationship("Issue", back_populates="chunks")
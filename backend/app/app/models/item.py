@@ -1,7 +1,17 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    literal_column,
+    text,
+)
+from sqlalchemy.orm import column_property, relationship
 
 from app.db.base_class import Base
 
@@ -12,6 +22,39 @@ if TYPE_CHECKING:
 class Item(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    description = Column(String, index=True)
+    description = Column(String)
     owner_id = Column(Integer, ForeignKey("user.id"))
     owner = relationship("User", back_populates="items")
+    # Bumped by every UPDATE; feeds the item's ETag
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+    # Id of the transaction that last inserted or updated the row; orders the
+    # incremental sync feed (see `CRUDItem.get_changes`)
+    changed_txid = Column(
+        BigInteger,
+        nullable=False,
+        default=func.txid_current(),
+        server_default=text("txid_current()"),
+        onupdate=func.txid_current(),
+    )
+    # Not stored: ix_item_search_vector indexes this exact expression, which
+    # Postgres only matches when it is spelled the same way (hence the literals)
+    _search_document = func.to_tsvector(
+        literal_column("'english'"),
+        func.coalesce(title, literal_column("''"))
+        .concat(literal_column("' '"))
+        .concat(func.coalesce(description, literal_column("''"))),
+    )
+    search_vector = column_property(_search_document, deferred=True)
+
+    __table_args__ = (
+        Index("ix_item_owner_id_id", "owner_id", "id"),
+        Index("ix_item_changed_txid_id", "changed_txid", "id"),
+        Index("ix_item_owner_id_changed_txid_id", "owner_id", "changed_txid", "id"),
+        Index("ix_item_search_vector", _search_document, postgresql_using="gin"),
+    )
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, func, text
+
+from app.db.base_class import Base
+
+
+class ItemTombstone(Base):
+    """
+    Record of a deleted item, so incremental sync can tell clients to drop it.
+
+    `id` is the deleted item's id; `changed_txid` is the deleting transaction.
+    `owner_id` is null for items that had no owner, like `Item.owner_id`.
+    """
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    owner_id = Column(Integer)
+    changed_txid = Column(
+        BigInteger,
+        nullable=False,
+        default=func.txid_current(),
+        server_default=text("txid_current()"),
+    )
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_itemtombstone_changed_txid_id", "changed_txid", "id"),
+        Index(
+            "ix_itemtombstone_owner_id_changed_txid_id",
+            "owner_id",
+            "changed_txid",
+            "id",
+        ),
+    )
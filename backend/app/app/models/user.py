@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Integer, String, literal_column
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -16,4 +16,14 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean(), default=True)
     is_superuser = Column(Boolean(), default=False)
+    # Bumped by every UPDATE; feeds the user's ETag
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+    # Number of items owned, kept up to date by `CRUDItem` in the writing transaction
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
     items = relationship("Item", back_populates="owner")
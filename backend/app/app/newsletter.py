@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from queue import Empty, LifoQueue
+from smtplib import SMTPException
+from typing import Iterator
+
+from emails.backend.smtp import SMTPBackend
+from emails.template import JinjaTemplate
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.issue import Issue
+from app.models.issue_chunk import IssueChunk
+from app.models.user import User
+from app.utils import get_smtp_options, send_email
+
+# First key of the advisory locks that keep one task at a time on a chunk
+CHUNK_LOCK_CLASS = 0x6E6C
+
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        """
+        Token bucket shared by the threads of one process.
+
+        **Parameters**
+
+        * `rate`: Permits per second; 0 disables limiting
+        """
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            # Reserve the permit now and sleep off any deficit outside the lock.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class SMTPConnectionPool:
+    def __init__(self, size: int):
+        """
+        Up to `size` persistent SMTP connections shared by the tasks of a process.
+        """
+        self.size = size
+        self._idle: "LifoQueue[SMTPBackend]" = LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[SMTPBackend]:
+        smtp = self._checkout()
+        try:
+            yield smtp
+        except Exception:
+            # Reconnect on next use rather than reuse a possibly broken session.
+            smtp.close()
+            raise
+        finally:
+            self._idle.put(smtp)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+    def _checkout(self) -> SMTPBackend:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return SMTPBackend(**get_smtp_options())
+        return self._idle.get()
+
+
+rate_limiter = RateLimiter(
+    settings.NEWSLETTER_RATE_LIMIT / max(settings.NEWSLETTER_SENDING_PROCESSES, 1)
+)
+smtp_pool = SMTPConnectionPool(settings.NEWSLETTER_SMTP_CONNECTIONS)
+
+
+def send_chunk(chunk_id: int) -> int:
+    """
+    Send the issue to the remaining recipients of a chunk and return how many
+    emails went out.
+
+    Runs on one connection holding an advisory lock on the chunk, so duplicate
+    deliveries of the same task back off instead of sending twice.
+    """
+    with engine.connect() as conn:
+        locked = conn.execute(
+            select(func.pg_try_advisory_lock(CHUNK_LOCK_CLASS, chunk_id))
+        ).scalar()
+        if not locked:
+            logging.info(f"issue chunk {chunk_id} is already being sent")
+            return 0
+        try:
+            return send_locked_chunk(conn, chunk_id)
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(CHUNK_LOCK_CLASS, chunk_id)))
+
+
+def send_locked_chunk(conn: Connection, chunk_id: int) -> int:
+    chunks = IssueChunk.__table__
+    users = User.__table__
+    with conn.begin():
+        chunk = conn.execute(chunks.select().where(chunks.c.id == chunk_id)).first()
+        if chunk is None or chunk.completed_at is not None:
+            return 0
+        issue = conn.execute(
+            Issue.__table__.select().where(Issue.__table__.c.id == chunk.issue_id)
+        ).first()
+        recipients = conn.execute(
+            select(users.c.id, users.c.email, users.c.full_name)  # type: ignore
+            .where(
+                users.c.is_active.is_(True),
+                users.c.id > chunk.sent_through_user_id,
+                users.c.id <= chunk.last_user_id,
+            )
+            .order_by(users.c.id)
+        ).fetchall()
+    html_template = JinjaTemplate(issue.body)
+    sent = 0
+    with smtp_pool.connection() as smtp:
+        for recipient in recipients:
+            rate_limiter.acquire()
+            response = send_email(
+                email_to=recipient.email,
+                subject_template=issue.subject,
+                html_template=html_template,
+                environment={
+                    "project_name": settings.PROJECT_NAME,
+                    "email": recipient.email,
+                    "full_name": recipient.full_name,
+                },
+                smtp=smtp,
+            )
+            if response.status_code is None:
+                # The connection failed; retry the task from this recipient.
+                raise SMTPException(str(response.error))
+            delivered = response.status_code == 250
+            if delivered:
+                sent += 1
+            else:
+                logging.warning(
+                    f"issue {issue.id} rejected for {recipient.email}: "
+                    f"{response.status_code} {response.status_text}"
+                )
+            with conn.begin():
+                conn.execute(
+                    chunks.update()
+                    .where(chunks.c.id == chunk_id)
+                    .values(
+                        sent_through_user_id=recipient.id,
+                        sent_count=chunks.c.sent_count + int(delivered),
+                    )
+                )
+    with conn.begin():
+        conn.execute(
+            chunks.update()
+            .where(chunks.c.id == chunk_id)
+            .values(completed_at=datetime.utcnow())
+        )
+    return sent
@@ -1,4 +1,14 @@
-from .item import Item, ItemCreate, ItemInDB, ItemUpdate
+from .batch import BatchOperation, BatchRequest, BatchResponse, BatchResult
+from .issue import Issue, IssueCreate, IssueInDB, IssueProgress, IssueUpdate
+from .item import (
+    Item,
+    ItemBulkUpdate,
+    ItemChange,
+    ItemChanges,
+    ItemCreate,
+    ItemInDB,
+    ItemUpdate,
+)
 from .msg import Msg
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserInDB, UserUpdate
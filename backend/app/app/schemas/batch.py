@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+# One API call inside a batch; `path` is relative to the API prefix
+class BatchOperation(BaseModel):
+    method: str = "GET"
+    path: str
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    # Commit all operations together, or none if any of them fails
+    atomic: bool = False
+
+
+class BatchResult(BaseModel):
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchResult]
+    rolled_back: bool = False
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# Shared properties
+class IssueBase(BaseModel):
+    subject: Optional[str] = None
+    body: Optional[str] = None
+
+
+# Properties to receive on issue creation
+class IssueCreate(IssueBase):
+    subject: str
+    body: str
+
+
+# Properties to receive on issue update
+class IssueUpdate(IssueBase):
+    pass
+
+
+# Properties shared by models stored in DB
+class IssueInDBBase(IssueBase):
+    id: int
+    subject: str
+    body: str
+    created_at: datetime
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Issue(IssueInDBBase):
+    pass
+
+
+# Properties properties stored in DB
+class IssueInDB(IssueInDBBase):
+    pass
+
+
+# Delivery progress of an issue being sent
+class IssueProgress(BaseModel):
+    recipients: int
+    sent: int
+    chunks: int
+    chunks_completed: int
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -19,6 +19,11 @@ class ItemUpdate(ItemBase):
     pass
 
 
+# Properties to receive on bulk item update
+class ItemBulkUpdate(ItemUpdate):
+    id: int
+
+
 # Properties shared by models stored in DB
 class ItemInDBBase(ItemBase):
     id: int
@@ -37,3 +42,19 @@ class Item(ItemInDBBase):
 # Properties properties stored in DB
 class ItemInDB(ItemInDBBase):
     pass
+
+
+# One entry of the incremental sync feed; deleted items carry only id and owner_id
+class ItemChange(BaseModel):
+    id: int
+    owner_id: int
+    deleted: bool
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+class ItemChanges(BaseModel):
+    changes: List[ItemChange]
+    # Pass back as `since` to get the changes after these
+    cursor: Optional[str] = None
+    has_more: bool
@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.api_v1.api import with_async_routes
+from app.api.api_v1.endpoints import async_items, items
+from app.core.config import settings
+from app.tests.utils.item import create_random_item
+
+
+def test_async_routes_replace_sync_ones() -> None:
+    router = with_async_routes(items.router, async_items.router)
+    endpoints = {
+        (route.path, frozenset(route.methods)): route.endpoint  # type: ignore
+        for route in router.routes
+    }
+    assert endpoints[("/{id}", frozenset({"GET"}))] is async_items.read_item
+    assert endpoints[("/bulk", frozenset({"DELETE"}))] is items.delete_items
+    assert len(router.routes) == len(items.router.routes)
+
+
+def test_async_read_item(
+    async_client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    item = create_random_item(db)
+    response = async_client.get(
+        f"{settings.API_V1_STR}/items/{item.id}", headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["id"] == item.id
+    assert content["owner_id"] == item.owner_id
+
+
+def test_async_create_item(
+    async_client: TestClient, superuser_token_headers: dict
+) -> None:
+    data = {"title": "Foo", "description": "Fighters"}
+    response = async_client.post(
+        f"{settings.API_V1_STR}/items/", headers=superuser_token_headers, json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["title"] == data["title"]
+    assert "id" in content
+
+
+def test_async_read_item_fields(
+    async_client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    item = create_random_item(db)
+    response = async_client.get(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers=superuser_token_headers,
+        params={"fields": "title"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": item.id, "title": item.title}
+
+    response = async_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"fields": "title", "limit": 1},
+    )
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "title"}
+
+    response = async_client.get(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers=superuser_token_headers,
+        params={"fields": "hashed_password"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.tests.utils.item import create_random_item
+
+
+def test_batch(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    data = {
+        "operations": [
+            {"path": "/users/me"},
+            {
+                "method": "PUT",
+                "path": f"/items/{item.id}",
+                "body": {"title": "Batched"},
+            },
+            {"path": "/items/?limit=1000"},
+        ]
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/batch", headers=normal_user_token_headers, json=data
+    )
+    assert response.status_code == 200
+    me, updated, items = response.json()["results"]
+    assert me["status"] == 200
+    assert me["body"]["email"] == settings.EMAIL_TEST_USER
+    assert updated["status"] == 200
+    assert updated["body"]["title"] == "Batched"
+    assert items["status"] == 200
+    titles = {i["id"]: i["title"] for i in items["body"]}
+    assert titles[item.id] == "Batched"
+    db.expire_all()
+    stored = crud.item.get(db, id=item.id)
+    assert stored and stored.title == "Batched"
+
+
+def test_batch_atomic_rollback(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    title = item.title
+    data = {
+        "atomic": True,
+        "operations": [
+            {"method": "PUT", "path": f"/items/{item.id}", "body": {"title": "Lost"}},
+            {"method": "PUT", "path": "/items/0", "body": {"title": "Missing"}},
+            {"path": "/users/me"},
+        ],
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/batch", headers=normal_user_token_headers, json=data
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["rolled_back"]
+    assert [result["status"] for result in content["results"]] == [200, 404]
+    db.expire_all()
+    stored = crud.item.get(db, id=item.id)
+    assert stored and stored.title == title
+
+
+def test_batch_rejects_nested_batch(
+    client: TestClient, normal_user_token_headers: dict
+) -> None:
+    data = {"operations": [{"method": "POST", "path": "/batch"}]}
+    response = client.post(
+        f"{settings.API_V1_STR}/batch", headers=normal_user_token_headers, json=data
+    )
+    assert response.status_code == 400
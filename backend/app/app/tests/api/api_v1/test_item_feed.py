@@ -0,0 +1,127 @@
+import asyncio
+from typing import Dict
+
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.db.session import async_session_factory, engine_options
+from app.item_feed import ItemChangeFeed, Subscription
+from app.schemas.item import ItemCreate
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def test_subscription_drops_oldest() -> None:
+    async def fill() -> Subscription:
+        subscription = Subscription(owner_id=None, max_queued=2)
+        for n in range(3):
+            subscription.put({"n": n})
+        return subscription
+
+    loop = asyncio.new_event_loop()
+    try:
+        subscription = loop.run_until_complete(fill())
+    finally:
+        loop.close()
+    assert subscription.dropped == 1
+    assert [subscription.queue.get_nowait()["n"] for _ in range(2)] == [1, 2]
+
+
+def test_feed_fans_out_crud_changes(db: Session) -> None:
+    user = create_random_user(db)
+    other_user = create_random_user(db)
+
+    async def listen() -> list:
+        feed = ItemChangeFeed(str(settings.SQLALCHEMY_DATABASE_URI), max_queued=10)
+        await feed.start()
+        try:
+            await asyncio.wait_for(feed.listening.wait(), 10)
+            own = feed.subscribe(user.id)
+            everything = feed.subscribe(None)
+            crud.item.create_with_owner(
+                db, obj_in=ItemCreate(title=random_lower_string()), owner_id=user.id
+            )
+            items = crud.item.create_multi_with_owner(
+                db,
+                objs_in=[ItemCreate(title=random_lower_string())],
+                owner_id=other_user.id,
+            )
+            crud.item.remove(db, id=items[0].id)
+            events = [await asyncio.wait_for(own.get(), 10)]
+            events += [await asyncio.wait_for(everything.get(), 10) for _ in range(3)]
+            assert own.queue.empty()
+            return events
+        finally:
+            await feed.stop()
+
+    loop = asyncio.new_event_loop()
+    try:
+        events = loop.run_until_complete(listen())
+    finally:
+        loop.close()
+    assert [(event["action"], event["owner_id"]) for event in events] == [
+        ("create", user.id),
+        ("create", user.id),
+        ("create", other_user.id),
+        ("delete", other_user.id),
+    ]
+    assert events[-1]["ids"] == [events[-2]["ids"][0]]
+
+
+def test_feed_fans_out_async_crud_changes(db: Session) -> None:
+    user = create_random_user(db)
+
+    async def listen() -> list:
+        async_engine = create_async_engine(
+            settings.SQLALCHEMY_ASYNC_DATABASE_URI, **engine_options(is_async=True)
+        )
+        feed = ItemChangeFeed(str(settings.SQLALCHEMY_DATABASE_URI), max_queued=10)
+        await feed.start()
+        try:
+            await asyncio.wait_for(feed.listening.wait(), 10)
+            own = feed.subscribe(user.id)
+            async with async_session_factory(async_engine)() as async_db:
+                item = await crud.async_item.create_with_owner(
+                    async_db,
+                    obj_in=ItemCreate(title=random_lower_string()),
+                    owner_id=user.id,
+                )
+                await crud.async_item.update(
+                    async_db, db_obj=item, obj_in={"title": random_lower_string()}
+                )
+                await crud.async_item.remove(async_db, id=item.id)
+                # Ownerless items still get their tombstone, but no event
+                ownerless = await crud.async_item.create(
+                    async_db, obj_in=ItemCreate(title=random_lower_string())
+                )
+                await crud.async_item.remove(async_db, id=ownerless.id)
+            return [await asyncio.wait_for(own.get(), 10) for _ in range(3)]
+        finally:
+            await feed.stop()
+            await async_engine.dispose()
+
+    loop = asyncio.new_event_loop()
+    try:
+        events = loop.run_until_complete(listen())
+    finally:
+        loop.close()
+    assert [event["action"] for event in events] == ["create", "update", "delete"]
+    assert len({event["ids"][0] for event in events}) == 1
+    db.refresh(user)
+    assert user.item_count == 0
+
+
+def test_feed_is_unavailable_through_pgbouncer(
+    client: TestClient,
+    normal_user_token_headers: Dict[str, str],
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "DB_USE_PGBOUNCER", True)
+    r = client.get(
+        f"{settings.API_V1_STR}/items/feed", headers=normal_user_token_headers
+    )
+    assert r.status_code == 503
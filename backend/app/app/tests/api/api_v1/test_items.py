@@ -1,8 +1,30 @@
+import csv
+import io
+import json
+from typing import List
+
+import pytest
+from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app import crud
 from app.core.config import settings
+from app.models.item import Item
+from app.schemas.item import ItemCreate
 from app.tests.utils.item import create_random_item
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import query_budget, random_lower_string
+from app.utils import generate_page_cursor
+
+
+@pytest.fixture(params=["client", "async_client"])
+def items_client(request: FixtureRequest) -> TestClient:
+    """
+    Client for the sync items router, then for the async one.
+    """
+    return request.getfixturevalue(request.param)
 
 
 def test_create_item(
@@ -33,3 +55,327 @@ def test_read_item(
     assert content["description"] == item.description
     assert content["id"] == item.id
     assert content["owner_id"] == item.owner_id
+
+
+def test_read_item_etag(
+    items_client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    response = items_client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = items_client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    crud.item.update(db, db_obj=item, obj_in={"title": random_lower_string()})
+    response = items_client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_read_items_etag(
+    items_client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    # Page from the new item on, so later items land on the same page
+    url = f"{settings.API_V1_STR}/items/"
+    params = {"cursor": generate_page_cursor(owner_id=owner.id, id=item.id - 1)}
+    response = items_client.get(url, headers=normal_user_token_headers, params=params)
+    etag = response.headers["ETag"]
+    response = items_client.get(
+        url,
+        headers={**normal_user_token_headers, "If-None-Match": etag},
+        params=params,
+    )
+    assert response.status_code == 304
+
+    create_random_item(db, owner_id=owner.id)
+    response = items_client.get(
+        url,
+        headers={**normal_user_token_headers, "If-None-Match": etag},
+        params=params,
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_read_items_cursor(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    for _ in range(3):
+        create_random_item(db, owner_id=owner.id)
+    seen: List[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) >= 3
+
+
+def test_read_items_foreign_cursor(
+    client: TestClient, normal_user_token_headers: dict
+) -> None:
+    cursor = generate_page_cursor(owner_id=-1, id=0)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"cursor": cursor},
+    )
+    assert response.status_code == 400
+
+
+def test_read_items_fast_json(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    for _ in range(3):
+        create_random_item(db, owner_id=owner.id)
+    url = f"{settings.API_V1_STR}/items/"
+    params = {"limit": 2}
+    response = client.get(url, headers=normal_user_token_headers, params=params)
+    monkeypatch.setattr(settings, "USE_FAST_JSON_RESPONSES", True)
+    fast_response = client.get(url, headers=normal_user_token_headers, params=params)
+    assert fast_response.status_code == 200
+    assert fast_response.json() == response.json()
+    assert fast_response.headers["X-Next-Cursor"] == response.headers["X-Next-Cursor"]
+
+
+def test_read_items_total_count(
+    items_client: TestClient,
+    normal_user_token_headers: dict,
+    superuser_token_headers: dict,
+    db: Session,
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    create_random_item(db, owner_id=owner.id)
+    response = items_client.get(
+        f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+    )
+    assert (
+        int(response.headers["X-Total-Count"])
+        == db.query(Item).filter(Item.owner_id == owner.id).count()
+    )
+
+    response = items_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"exact": True},
+    )
+    assert int(response.headers["X-Total-Count"]) == db.query(Item).count()
+
+
+def test_read_items_fields(
+    items_client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    response = items_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={
+            "fields": "title",
+            "cursor": generate_page_cursor(owner_id=owner.id, id=item.id - 1),
+        },
+    )
+    assert response.status_code == 200
+    assert {"id": item.id, "title": item.title} in response.json()
+    assert all(set(row) == {"id", "title"} for row in response.json())
+
+    response = items_client.get(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers=normal_user_token_headers,
+        params={"fields": "description"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": item.id, "description": item.description}
+
+    response = items_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"fields": "title,hashed_password"},
+    )
+    assert response.status_code == 400
+
+
+def test_read_item_changes(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/items/changes"
+    cursor = None
+    while True:
+        params = {"limit": 100}
+        if cursor:
+            params["since"] = cursor
+        response = client.get(url, headers=normal_user_token_headers, params=params)
+        assert response.status_code == 200
+        content = response.json()
+        cursor = content["cursor"]
+        if not content["has_more"]:
+            break
+
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    crud.item.remove_multi(db, ids=[create_random_item(db, owner_id=owner.id).id])
+    response = client.get(
+        url, headers=normal_user_token_headers, params={"since": cursor}
+    )
+    content = response.json()
+    assert [change["deleted"] for change in content["changes"]] == [False, True]
+    assert content["changes"][0]["id"] == item.id
+    assert content["cursor"] != cursor
+
+
+def test_search_items_cursor(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    word = random_lower_string()
+    for _ in range(3):
+        crud.item.create_with_owner(
+            db, obj_in=ItemCreate(title=word), owner_id=owner.id
+        )
+    crud.item.create_with_owner(
+        db, obj_in=ItemCreate(title=word), owner_id=create_random_user(db).id
+    )
+    seen: List[int] = []
+    cursor = None
+    while True:
+        params = {"q": word, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"{settings.API_V1_STR}/items/search",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert all(item["owner_id"] == owner.id for item in content)
+        seen.extend(item["id"] for item in content)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 3
+
+
+def test_export_items(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert all(row["owner_id"] == owner.id for row in rows)
+    assert {
+        "id": item.id,
+        "title": item.title,
+        "description": item.description,
+        "owner_id": owner.id,
+    } in rows
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=normal_user_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert str(item.id) in [row["id"] for row in rows]
+
+
+def test_bulk_items(client: TestClient, superuser_token_headers: dict) -> None:
+    data = [{"title": "Foo", "description": str(n)} for n in range(3)]
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk", headers=superuser_token_headers, json=data,
+    )
+    assert response.status_code == 200
+    created = response.json()
+    assert [item["description"] for item in created] == ["0", "1", "2"]
+    ids = [item["id"] for item in created]
+
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=superuser_token_headers,
+        json=[{"id": id, "title": "Bar"} for id in ids],
+    )
+    assert response.status_code == 200
+    assert all(item["title"] == "Bar" for item in response.json())
+
+    response = client.delete(
+        f"{settings.API_V1_STR}/items/bulk", headers=superuser_token_headers, json=ids,
+    )
+    assert response.status_code == 200
+    assert sorted(item["id"] for item in response.json()) == sorted(ids)
+
+
+def test_bulk_delete_foreign_items(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.delete(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[item.id],
+    )
+    assert response.status_code == 400
+    assert crud.item.get(db=db, id=item.id)
+
+
+def test_read_items_query_budget(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    owner = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    item = create_random_item(db, owner_id=owner.id)
+    # Warm the principal cache, so the budgets cover only the endpoints themselves
+    client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    # Page, X-Total-Count
+    with query_budget(2):
+        r = client.get(
+            f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+        )
+    assert r.status_code == 200
+    # Item
+    with query_budget(1):
+        r = client.get(
+            f"{settings.API_V1_STR}/items/{item.id}", headers=normal_user_token_headers
+        )
+    assert r.status_code == 200
@@ -1,8 +1,14 @@
+from datetime import datetime, timedelta
 from typing import Dict
 
 from fastapi.testclient import TestClient
+from jose import jwt
 
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.security import ALGORITHM
+from app.db.session import engine
+from app.tests.utils.utils import count_pool_checkouts
 
 
 def test_get_access_token(client: TestClient) -> None:
@@ -26,3 +32,49 @@ def test_use_access_token(
     result = r.json()
     assert r.status_code == 200
     assert "email" in result
+
+
+def test_invalid_token_checks_out_no_connection(client: TestClient) -> None:
+    with count_pool_checkouts() as checkouts:
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me",
+            headers={"Authorization": "Bearer not-a-token"},
+        )
+    assert r.status_code == 403
+    assert checkouts == []
+
+
+def test_token_without_subject_is_rejected(client: TestClient) -> None:
+    expire = datetime.utcnow() + timedelta(minutes=5)
+    token = jwt.encode({"exp": expire}, settings.SECRET_KEY, algorithm=ALGORITHM)
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert r.status_code == 403
+
+
+def test_cached_principal_checks_out_no_connection(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    with count_pool_checkouts() as checkouts:
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+    assert checkouts == []
+
+
+def test_principal_miss_releases_connection(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    if principal_cache.backend:
+        principal_cache.backend.clear()
+    checked_out = engine.pool.checkedout()
+    with count_pool_checkouts() as checkouts:
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+    assert len(checkouts) == 1
+    assert engine.pool.checkedout() == checked_out
@@ -1,12 +1,15 @@
 from typing import Dict
+from urllib.parse import parse_qs, urlsplit
 
+from _pytest.monkeypatch import MonkeyPatch
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app import crud
+from app.core.celery_app import celery_app
 from app.core.config import settings
 from app.schemas.user import UserCreate
-from app.tests.utils.utils import random_email, random_lower_string
+from app.tests.utils.utils import query_budget, random_email, random_lower_string
 
 
 def test_get_users_superuser_me(
@@ -113,3 +116,150 @@ def test_retrieve_users(
     assert len(all_users) > 1
     for item in all_users:
         assert "email" in item
+
+
+def test_create_user_enqueues_new_account_email(
+    client: TestClient, superuser_token_headers: dict, monkeypatch: MonkeyPatch
+) -> None:
+    sent_tasks = []
+    monkeypatch.setattr(settings, "EMAILS_ENABLED", True)
+    monkeypatch.setattr(
+        celery_app, "send_task", lambda name, args: sent_tasks.append((name, args))
+    )
+    username = random_email()
+    password = random_lower_string()
+    data = {"email": username, "password": password}
+    r = client.post(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, json=data,
+    )
+    assert 200 <= r.status_code < 300
+    assert len(sent_tasks) == 1
+    name, (emails,) = sent_tasks[0]
+    assert name == "app.worker.send_emails"
+    assert emails[0]["email_to"] == username
+    assert emails[0]["template_name"] == "new_account.html"
+    assert "token=" in emails[0]["environment"]["set_password_link"]
+    assert password not in repr(sent_tasks)
+
+
+def test_new_account_email_link_sets_password(
+    client: TestClient, superuser_token_headers: dict, monkeypatch: MonkeyPatch
+) -> None:
+    sent_tasks = []
+    monkeypatch.setattr(settings, "EMAILS_ENABLED", True)
+    monkeypatch.setattr(
+        celery_app, "send_task", lambda name, args: sent_tasks.append((name, args))
+    )
+    username = random_email()
+    data = {"email": username, "password": random_lower_string()}
+    r = client.post(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, json=data,
+    )
+    assert 200 <= r.status_code < 300
+    _, (emails,) = sent_tasks[0]
+    link = emails[0]["environment"]["set_password_link"]
+    [token] = parse_qs(urlsplit(link).query)["token"]
+    new_password = random_lower_string()
+    r = client.post(
+        f"{settings.API_V1_STR}/reset-password/",
+        json={"token": token, "new_password": new_password},
+    )
+    assert r.status_code == 200
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": username, "password": new_password},
+    )
+    assert r.status_code == 200
+    assert r.json()["access_token"]
+
+
+def test_retrieve_users_fast_json(
+    client: TestClient, superuser_token_headers: dict, monkeypatch: MonkeyPatch
+) -> None:
+    url = f"{settings.API_V1_STR}/users/"
+    params = {"limit": 5}
+    response = client.get(url, headers=superuser_token_headers, params=params)
+    monkeypatch.setattr(settings, "USE_FAST_JSON_RESPONSES", True)
+    fast_response = client.get(url, headers=superuser_token_headers, params=params)
+    assert fast_response.status_code == 200
+    assert fast_response.json() == response.json()
+    assert fast_response.headers.get("X-Next-Cursor") == response.headers.get(
+        "X-Next-Cursor"
+    )
+
+
+def test_get_user_fields(
+    client: TestClient, normal_user_token_headers: Dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    response = client.get(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=normal_user_token_headers,
+        params={"fields": "email"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": user.id, "email": user.email}
+
+
+def test_get_users_me_etag(
+    client: TestClient, normal_user_token_headers: Dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    response = client.get(url, headers=normal_user_token_headers)
+    etag = response.headers["ETag"]
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    crud.user.update(
+        db, db_obj=user, obj_in={"full_name": random_lower_string(), "password": None}
+    )
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_read_own_user_query_budget(
+    client: TestClient, normal_user_token_headers: Dict[str, str], db: Session
+) -> None:
+    user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+    assert user
+    # Warm the principal cache, so the budget covers only the endpoint itself
+    client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    with query_budget(0):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+        )
+        assert r.status_code == 200
+        r = client.get(
+            f"{settings.API_V1_STR}/users/{user.id}", headers=normal_user_token_headers
+        )
+        assert r.status_code == 200
+
+
+def test_read_users_etag(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/users/"
+    params = {"limit": 5}
+    # Warm the principal cache, so the budgets cover only the endpoint itself
+    client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    # Only the page; its rows give the ETag
+    with query_budget(1):
+        response = client.get(url, headers=superuser_token_headers, params=params)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    # Only the (id, version) pairs
+    with query_budget(1):
+        response = client.get(
+            url,
+            headers={**superuser_token_headers, "If-None-Match": etag},
+            params=params,
+        )
+    assert response.status_code == 304
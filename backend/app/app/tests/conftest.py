@@ -1,14 +1,25 @@
-from typing import Dict, Generator
+from pathlib import Path
+from typing import AsyncGenerator, Dict, Generator
 
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from aiosmtpd.controller import Controller
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session
 
+from app import newsletter, worker
+from app.api import deps
+from app.api.api_v1.api import with_async_routes
+from app.api.api_v1.endpoints import async_items, items
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, async_session_factory, engine_options
 from app.main import app
+from app.tests.utils.smtp import RecordingHandler, get_free_port
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
+from app.utils import email_templates
 
 
 @pytest.fixture(scope="session")
@@ -22,6 +33,29 @@ def client() -> Generator:
         yield c
 
 
+@pytest.fixture(scope="module")
+def async_client() -> Generator:
+    # The app's async engine only exists with USE_ASYNC_DATABASE, so bring one
+    session_factory = async_session_factory(
+        create_async_engine(
+            settings.SQLALCHEMY_ASYNC_DATABASE_URI, **engine_options(is_async=True)
+        )
+    )
+
+    async def get_async_db() -> AsyncGenerator:
+        async with session_factory() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(
+        with_async_routes(items.router, async_items.router),
+        prefix=f"{settings.API_V1_STR}/items",
+    )
+    async_app.dependency_overrides[deps.get_async_db] = get_async_db
+    with TestClient(async_app) as c:
+        yield c
+
+
 @pytest.fixture(scope="module")
 def superuser_token_headers(client: TestClient) -> Dict[str, str]:
     return get_superuser_token_headers(client)
@@ -32,3 +66,31 @@ def normal_user_token_headers(client: TestClient, db: Session) -> Dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def smtp_server(monkeypatch: MonkeyPatch, tmp_path: Path) -> Generator:
+    """
+    Local SMTP server the app is configured to send to, with stand-in templates.
+    """
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=get_free_port())
+    controller.start()
+    (tmp_path / "test_email.html").write_text("Hi {{ email }}")
+    monkeypatch.setattr(email_templates, "templates_dir", tmp_path)
+    email_templates.clear()
+    monkeypatch.setattr(settings, "SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(settings, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_USER", None)
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", None)
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "bot@example.com")
+    monkeypatch.setattr(settings, "EMAILS_ENABLED", True)
+    monkeypatch.setattr(worker, "smtp_backend", None)
+    monkeypatch.setattr(newsletter, "smtp_pool", newsletter.SMTPConnectionPool(1))
+    yield handler
+    if worker.smtp_backend:
+        worker.smtp_backend.close()
+    newsletter.smtp_pool.close()
+    email_templates.clear()
+    controller.stop()
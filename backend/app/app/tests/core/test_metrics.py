@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+from typing import Dict
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.tests.utils.item import create_random_item
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_labeled_by_route_template(
+    client: TestClient, superuser_token_headers: Dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    route = f"{settings.API_V1_STR}/items/{{id}}"
+    labels = {"method": "GET", "route": route}
+    before = sample("http_requests_total", status="200", **labels)
+    latencies = sample("http_request_duration_seconds_count", **labels)
+    r = client.get(
+        f"{settings.API_V1_STR}/items/{item.id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert sample("http_requests_total", status="200", **labels) == before + 1
+    assert sample("http_request_duration_seconds_count", **labels) == latencies + 1
+    assert sample("http_requests_in_flight") == 0
+
+
+def test_unmatched_paths_share_one_label(client: TestClient) -> None:
+    labels = {"method": "GET", "route": metrics.UNMATCHED_ROUTE, "status": "404"}
+    before = sample("http_requests_total", **labels)
+    client.get("/no-such-path-1")
+    client.get("/no-such-path-2")
+    assert sample("http_requests_total", **labels) == before + 2
+
+
+def test_metrics_endpoint(client: TestClient) -> None:
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert "http_requests_total" in r.text
+
+
+def test_celery_task_metrics() -> None:
+    headers: Dict[str, float] = {}
+    metrics.on_task_publish(headers=headers)
+    task = SimpleNamespace(
+        name="app.worker.test_celery", request=SimpleNamespace(headers=headers),
+    )
+    labels = {"task": task.name}
+    runs = sample("celery_task_runtime_seconds_count", **labels)
+    waits = sample("celery_task_queue_wait_seconds_count", **labels)
+    failures = sample("celery_task_failures_total", **labels)
+
+    metrics.on_task_prerun(task_id="1", task=task)
+    metrics.on_task_failure(sender=task)
+    metrics.on_task_postrun(task_id="1", task=task)
+
+    assert sample("celery_task_runtime_seconds_count", **labels) == runs + 1
+    assert sample("celery_task_queue_wait_seconds_count", **labels) == waits + 1
+    assert sample("celery_task_failures_total", **labels) == failures + 1
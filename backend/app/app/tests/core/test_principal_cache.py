@@ -0,0 +1,37 @@
+import time
+
+from app.core.principal_cache import InMemoryPrincipalCacheBackend, PrincipalCache
+
+
+def test_in_memory_backend_evicts_least_recently_used() -> None:
+    backend = InMemoryPrincipalCacheBackend(max_size=2, ttl=60)
+    backend.set(1, {"id": 1})
+    backend.set(2, {"id": 2})
+    assert backend.get(1) == {"id": 1}
+    backend.set(3, {"id": 3})
+    assert backend.get(2) is None
+    assert backend.get(1) == {"id": 1}
+    assert backend.get(3) == {"id": 3}
+
+
+def test_in_memory_backend_expires_entries() -> None:
+    backend = InMemoryPrincipalCacheBackend(max_size=2, ttl=0.01)
+    backend.set(1, {"id": 1})
+    time.sleep(0.02)
+    assert backend.get(1) is None
+
+
+def test_principal_cache_counters() -> None:
+    cache = PrincipalCache(InMemoryPrincipalCacheBackend(max_size=2, ttl=60))
+    assert cache.get(1) is None
+    cache.set(1, {"id": 1})
+    assert cache.get(1) == {"id": 1}
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_disabled_principal_cache() -> None:
+    cache = PrincipalCache(None)
+    cache.set(1, {"id": 1})
+    assert cache.get(1) is None
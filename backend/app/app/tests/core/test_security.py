@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from app.core import security
+from app.core.config import settings
+
+
+def test_password_hash_roundtrip() -> None:
+    hashed_password = security.get_password_hash("secret")
+    assert security.verify_password("secret", hashed_password)
+    assert not security.verify_password("wrong", hashed_password)
+
+
+def test_password_hash_async_roundtrip() -> None:
+    async def roundtrip() -> bool:
+        hashed_password = await security.get_password_hash_async("secret")
+        return await security.verify_password_async("secret", hashed_password)
+
+    # A loop of its own: asyncio.run would leave the thread without a current
+    # loop, which the TestClient of later tests needs
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(roundtrip())
+    finally:
+        loop.close()
+
+
+def test_password_hasher_busy(monkeypatch: MonkeyPatch) -> None:
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(security, "_hasher_slots", slots)
+    with pytest.raises(security.PasswordHasherBusy):
+        security.get_password_hash("secret")
@@ -1,9 +1,16 @@
+import resource
+import tracemalloc
+
+from sqlalchemy import delete, func, text
 from sqlalchemy.orm import Session
 
 from app import crud
+from app.models.item import Item
+from app.models.item_tombstone import ItemTombstone
 from app.schemas.item import ItemCreate, ItemUpdate
 from app.tests.utils.user import create_random_user
 from app.tests.utils.utils import random_lower_string
+from app.utils import iter_ndjson
 
 
 def test_create_item(db: Session) -> None:
@@ -59,3 +66,172 @@ def test_delete_item(db: Session) -> None:
     assert item2.title == title
     assert item2.description == description
     assert item2.owner_id == user.id
+
+
+def test_delete_ownerless_items(db: Session) -> None:
+    items = [
+        crud.item.create(db, obj_in=ItemCreate(title=random_lower_string()))
+        for _ in range(2)
+    ]
+    ids = [item.id for item in items]
+    crud.item.remove(db, id=ids[0])
+    crud.item.remove_multi(db, ids=ids[1:])
+    tombstones = db.query(ItemTombstone).filter(ItemTombstone.id.in_(ids)).all()
+    assert sorted((t.id, t.owner_id) for t in tombstones) == [(id, None) for id in ids]
+
+
+def test_get_multi_by_owner_after_id(db: Session) -> None:
+    user = create_random_user(db)
+    items = [
+        crud.item.create_with_owner(
+            db=db, obj_in=ItemCreate(title=random_lower_string()), owner_id=user.id
+        )
+        for _ in range(3)
+    ]
+    first_page = crud.item.get_multi_by_owner(db=db, owner_id=user.id, limit=2)
+    assert [item.id for item in first_page] == [item.id for item in items[:2]]
+    next_page = crud.item.get_multi_by_owner(
+        db=db, owner_id=user.id, limit=2, after_id=first_page[-1].id
+    )
+    assert [item.id for item in next_page] == [items[2].id]
+
+
+def test_create_update_remove_multi(db: Session) -> None:
+    user = create_random_user(db)
+    items_in = [ItemCreate(title=random_lower_string()) for _ in range(3)]
+    items = crud.item.create_multi_with_owner(db=db, objs_in=items_in, owner_id=user.id)
+    assert [item.title for item in items] == [item_in.title for item_in in items_in]
+    assert all(item.owner_id == user.id for item in items)
+
+    ids = [item.id for item in items]
+    db_objs = crud.item.get_multi_by_ids(db=db, ids=ids)
+    description = random_lower_string()
+    updated = crud.item.update_multi(
+        db=db,
+        db_objs=db_objs,
+        objs_in=[ItemUpdate(description=description) for _ in db_objs],
+    )
+    assert all(item.description == description for item in updated)
+
+    removed = crud.item.remove_multi(db=db, ids=ids)
+    assert sorted(item.id for item in removed) == sorted(ids)
+    assert crud.item.get_multi_by_ids(db=db, ids=ids) == []
+
+
+def test_search(db: Session) -> None:
+    user = create_random_user(db)
+    other_user = create_random_user(db)
+    word = random_lower_string()
+    best = crud.item.create_with_owner(
+        db=db,
+        obj_in=ItemCreate(title=word, description=f"{word} {word}"),
+        owner_id=user.id,
+    )
+    worse = crud.item.create_with_owner(
+        db=db, obj_in=ItemCreate(title=word), owner_id=user.id
+    )
+    crud.item.create_with_owner(
+        db=db, obj_in=ItemCreate(title=word), owner_id=other_user.id
+    )
+    results = crud.item.search(db=db, q=word, owner_id=user.id)
+    assert [item.id for item, _ in results] == [best.id, worse.id]
+    first_page = crud.item.search(db=db, q=word, limit=1)
+    assert [item.id for item, _ in first_page] == [best.id]
+    item, rank = first_page[0]
+    next_page = crud.item.search(db=db, q=word, limit=3, after=(rank, item.id))
+    assert len(next_page) == 2
+    assert best.id not in [item.id for item, _ in next_page]
+
+
+def test_search_matches_the_search_vector_index(db: Session) -> None:
+    query = db.query(Item.id).filter(
+        Item.search_vector.op("@@")(func.websearch_to_tsquery("english", "word"))
+    )
+    sql = query.statement.compile(db.bind, compile_kwargs={"literal_binds": True})
+    conn = db.connection()
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+    db.rollback()
+    assert any("ix_item_search_vector" in line for line in plan)
+
+
+def test_export_memory_is_constant(db: Session) -> None:
+    rows = 1_000_000
+    user = create_random_user(db)
+    db.execute(
+        text(
+            "INSERT INTO item (title, description, owner_id) "
+            "SELECT 'export ' || n, md5(n::text), :owner_id "
+            "FROM generate_series(1, :count) AS n"
+        ),
+        {"owner_id": user.id, "count": rows},
+    )
+    db.commit()
+    try:
+        start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        exported = 0
+        for chunk in iter_ndjson(
+            crud.item.iter_rows(db, owner_id=user.id), columns=["id", "title"]
+        ):
+            exported += chunk.count(b"\n")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss
+        db.commit()
+        assert exported == rows
+        # A fully materialized export would take hundreds of MB
+        assert peak < 10 * 1024 * 1024
+        assert rss_growth < 50 * 1024  # KiB
+    finally:
+        db.execute(delete(Item.__table__).where(Item.owner_id == user.id))
+        db.commit()
+
+
+def test_get_changes(db: Session) -> None:
+    user = create_random_user(db)
+    kept, removed = [
+        crud.item.create_with_owner(
+            db=db, obj_in=ItemCreate(title=random_lower_string()), owner_id=user.id
+        )
+        for _ in range(2)
+    ]
+    changes = crud.item.get_changes(db, owner_id=user.id)
+    assert [(change.id, change.deleted) for change in changes] == [
+        (kept.id, False),
+        (removed.id, False),
+    ]
+    last = changes[-1]
+    assert (
+        crud.item.get_changes(db, owner_id=user.id, after=(last.changed_txid, last.id))
+        == []
+    )
+
+    title = random_lower_string()
+    crud.item.update(db, db_obj=kept, obj_in={"title": title})
+    crud.item.remove(db, id=removed.id)
+    changes = crud.item.get_changes(
+        db, owner_id=user.id, after=(last.changed_txid, last.id)
+    )
+    assert [(change.id, change.title, change.deleted) for change in changes] == [
+        (kept.id, title, False),
+        (removed.id, None, True),
+    ]
+
+
+def test_item_count(db: Session) -> None:
+    user = create_random_user(db)
+    item = crud.item.create_with_owner(
+        db=db, obj_in=ItemCreate(title=random_lower_string()), owner_id=user.id
+    )
+    items = crud.item.create_multi_with_owner(
+        db=db,
+        objs_in=[ItemCreate(title=random_lower_string()) for _ in range(3)],
+        owner_id=user.id,
+    )
+    assert crud.item.count_by_owner(db, owner_id=user.id) == 4
+    crud.item.remove(db=db, id=item.id)
+    crud.item.remove_multi(db=db, ids=[items[0].id, items[1].id])
+    assert crud.item.count_by_owner(db, owner_id=user.id) == 1
+    db.refresh(user)
+    assert user.item_count == 1
@@ -1,8 +1,12 @@
+from _pytest.monkeypatch import MonkeyPatch
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
 from app import crud
-from app.core.security import verify_password
+from app.core import security
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.security import get_crypt_context, verify_password
 from app.schemas.user import UserCreate, UserUpdate
 from app.tests.utils.utils import random_email, random_lower_string
 
@@ -92,3 +96,69 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_get_principal_cached(db: Session) -> None:
+    email = random_email()
+    user_in = UserCreate(email=email, password=random_lower_string())
+    user = crud.user.create(db, obj_in=user_in)
+    principal_cache.invalidate(user.id)
+    misses = principal_cache.stats()["misses"]
+    assert crud.user.get_principal(db, id=user.id) == user
+    assert principal_cache.stats()["misses"] == misses + 1
+    hits = principal_cache.stats()["hits"]
+    assert crud.user.get_principal(db, id=user.id) == user
+    assert principal_cache.stats()["hits"] == hits + 1
+
+
+def test_update_user_invalidates_principal(db: Session) -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    user = crud.user.create(db, obj_in=user_in)
+    crud.user.get_principal(db, id=user.id)
+    full_name = random_lower_string()
+    crud.user.update(db, db_obj=user, obj_in={"password": None, "full_name": full_name})
+    assert principal_cache.backend
+    assert principal_cache.backend.get(user.id) is None
+    principal = crud.user.get_principal(db, id=user.id)
+    assert principal
+    assert principal.full_name == full_name
+
+
+def test_authenticate_rehashes_outdated_hash(
+    db: Session, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(security, "pwd_context", get_crypt_context(["bcrypt"], 5))
+    password = random_lower_string()
+    user_in = UserCreate(email=random_email(), password=password)
+    user = crud.user.create(db, obj_in=user_in)
+    outdated_hash = get_crypt_context(["bcrypt"], 4).hash(password)
+    user.hashed_password = outdated_hash
+    db.commit()
+    authenticated_user = crud.user.authenticate(db, email=user.email, password=password)
+    assert authenticated_user
+    assert authenticated_user.hashed_password != outdated_hash
+    assert not security.pwd_context.needs_update(authenticated_user.hashed_password)
+    assert verify_password(password, authenticated_user.hashed_password)
+
+
+def test_multi_user_changes_invalidate_principals(db: Session) -> None:
+    users = [
+        crud.user.create(
+            db, obj_in=UserCreate(email=random_email(), password=random_lower_string())
+        )
+        for _ in range(2)
+    ]
+    for user in users:
+        crud.user.get_principal(db, id=user.id)
+    crud.user.update_multi(db, db_objs=users, objs_in=[{"is_active": False}] * 2)
+    assert principal_cache.backend
+    assert all(principal_cache.backend.get(user.id) is None for user in users)
+    principal = crud.user.get_principal(db, id=users[0].id)
+    assert principal and not principal.is_active
+
+    ids = [user.id for user in users]
+    crud.user.get_principal(db, id=ids[1])
+    crud.user.remove_multi(db, ids=ids)
+    assert principal_cache.backend.get(ids[1]) is None
+    assert crud.user.get_principal(db, id=ids[1]) is None
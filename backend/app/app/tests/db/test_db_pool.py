@@ -0,0 +1,60 @@
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+
+from app.core.config import settings
+from app.db.pool import instrument_engine, pool_status
+
+
+def test_pool_status_counts_checkouts() -> None:
+    engine = instrument_engine(
+        create_engine(
+            settings.SQLALCHEMY_DATABASE_URI,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+    )
+    with engine.connect():
+        status = pool_status(engine)
+        assert status["size"] == 1
+        assert status["checked_out"] == 1
+        assert status["overflow"] == 0
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["connects"] == 1
+    assert status["peak_checked_out"] == 1
+    assert status["hold_seconds_max"] > 0
+
+    engine.dispose()
+    with engine.connect():
+        pass
+    status = pool_status(engine)
+    assert status["checkouts"] == 2
+    assert status["connects"] == 2
+
+
+def test_read_db_pool_stats(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["primary"]["checkouts"] > 0
+    assert len(content["replicas"]) == len(settings.SQLALCHEMY_REPLICA_URIS)
+
+
+def test_read_db_pool_stats_needs_superuser(
+    client: TestClient, normal_user_token_headers: Dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 400
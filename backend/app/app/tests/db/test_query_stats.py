@@ -0,0 +1,53 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db.query_stats import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    QueryStatsMiddleware,
+    track_queries,
+)
+from app.db.session import engine
+
+
+def test_track_queries_counts_statements() -> None:
+    with engine.connect() as conn:
+        with track_queries() as outer:
+            conn.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+    assert inner.count == 1
+    assert outer.count == 2
+    assert outer.duration >= inner.duration > 0
+
+
+def test_n_plus_one_suspects() -> None:
+    statement = text("SELECT :n")
+    with engine.connect() as conn, track_queries() as stats:
+        for n in range(5):
+            conn.execute(statement, {"n": n})
+        for _ in range(5):
+            conn.execute(text("SELECT 1"))
+    suspects = stats.n_plus_one_suspects(5)
+    assert len(suspects) == 1
+    assert suspects[0][1] == 5
+    assert stats.n_plus_one_suspects(6) == []
+
+
+def test_query_stats_middleware_headers() -> None:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=5)
+
+    @app.get("/")
+    def run_queries() -> int:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            return conn.execute(text("SELECT 2")).scalar()
+
+    with TestClient(app) as client:
+        r = client.get("/")
+    assert r.json() == 2
+    assert r.headers[QUERY_COUNT_HEADER] == "2"
+    assert float(r.headers[QUERY_TIME_HEADER]) > 0
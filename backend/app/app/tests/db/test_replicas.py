@@ -0,0 +1,139 @@
+from typing import Any, List
+
+from _pytest.monkeypatch import MonkeyPatch
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.db import session as db_session
+from app.db.replicas import Replica, ReplicaPool
+from app.db.session import SessionLocal, replica_reads
+from app.models.item import Item
+from app.tests.utils.item import create_random_item
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+# The test database isn't in recovery, so as a "replica" it reports no lag
+REPLICA_URI = str(
+    settings.SQLALCHEMY_REPLICA_URIS[0]
+    if settings.SQLALCHEMY_REPLICA_URIS
+    else settings.SQLALCHEMY_DATABASE_URI
+)
+
+
+def make_replica(*, max_lag: float = 5) -> Replica:
+    return Replica(create_engine(REPLICA_URI), max_lag=max_lag, check_interval=60)
+
+
+def test_replica_lag_check() -> None:
+    replica = make_replica()
+    assert replica.is_healthy()
+    assert replica.lag is not None and replica.lag >= 0
+
+
+def test_lagging_replica_is_skipped() -> None:
+    pool = ReplicaPool([make_replica(max_lag=-1)])
+    assert pool.choose() is None
+
+
+def test_unreachable_replica_is_skipped() -> None:
+    engine = create_engine("postgresql://nobody@127.0.0.1:1/none")
+    pool = ReplicaPool([Replica(engine, max_lag=5, check_interval=60)])
+    assert pool.choose() is None
+
+
+def test_reads_go_to_replica_until_first_write(
+    monkeypatch: MonkeyPatch, db: Session
+) -> None:
+    replica = make_replica()
+    monkeypatch.setattr(db_session, "replica_pool", ReplicaPool([replica]))
+    item = create_random_item(db)
+    session = SessionLocal()
+    try:
+        query = select(Item)  # type: ignore
+        with replica_reads(session):
+            assert session.get_bind(Item, query) is replica.engine
+            # Only reads go to the replica
+            assert session.get_bind(Item) is db_session.engine
+        assert session.get_bind(Item, query) is db_session.engine
+
+        stored = crud.item.get(session, id=item.id)
+        assert stored
+        crud.item.update(session, db_obj=stored, obj_in={"title": "x"})
+        assert session.wrote
+        with replica_reads(session):
+            assert session.get_bind(Item, query) is db_session.engine
+    finally:
+        session.close()
+
+
+def test_lagging_replica_falls_back_to_primary(
+    monkeypatch: MonkeyPatch, db: Session
+) -> None:
+    pool = ReplicaPool([make_replica(max_lag=-1)])
+    monkeypatch.setattr(db_session, "replica_pool", pool)
+    item = create_random_item(db)
+    session = SessionLocal()
+    try:
+        with replica_reads(session):
+            query = select(Item)  # type: ignore
+            assert session.get_bind(Item, query) is db_session.engine
+        title = random_lower_string()
+        stored = crud.item.get(session, id=item.id)
+        assert stored
+        crud.item.update(session, db_obj=stored, obj_in={"title": title})
+        stored = crud.item.get(session, id=item.id)
+        assert stored and stored.title == title
+    finally:
+        session.close()
+
+
+def test_principals_are_loaded_from_primary(
+    monkeypatch: MonkeyPatch, db: Session
+) -> None:
+    replica = make_replica()
+    monkeypatch.setattr(db_session, "replica_pool", ReplicaPool([replica]))
+    statements: List[str] = []
+
+    @event.listens_for(replica.engine, "before_cursor_execute")
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    user = create_random_user(db)
+    principal_cache.invalidate(user.id)
+    session = SessionLocal()
+    try:
+        principal = crud.user.get_principal(session, id=user.id)
+        assert principal and principal.id == user.id
+    finally:
+        session.close()
+    # The replica only saw its lag checks
+    assert not any('FROM "user"' in statement for statement in statements)
+
+
+def test_owner_items_are_read_from_replica(
+    monkeypatch: MonkeyPatch, db: Session
+) -> None:
+    replica = make_replica()
+    monkeypatch.setattr(db_session, "replica_pool", ReplicaPool([replica]))
+    statements: List[str] = []
+
+    @event.listens_for(replica.engine, "before_cursor_execute")
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    owner = create_random_user(db)
+    create_random_item(db, owner_id=owner.id)
+    session = SessionLocal()
+    try:
+        items = crud.item.get_multi_by_owner(session, owner_id=owner.id)
+        rows = crud.item.get_multi_rows_by_owner(
+            session, columns=[Item.id], owner_id=owner.id
+        )
+    finally:
+        session.close()
+    assert len(items) == 1
+    assert [stored.id for stored in items] == [row.id for row in rows]
+    assert sum("FROM item" in statement for statement in statements) == 2
@@ -0,0 +1,101 @@
+import time
+from typing import Any, Dict
+
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.db.session import engine
+from app.db.slow_queries import describe_endpoint, redact_parameters, slow_query_log
+from app.tests.utils.item import create_random_item
+
+
+def wait_for_plan(entry: Dict[str, Any], timeout: float = 5) -> Any:
+    deadline = time.monotonic() + timeout
+    while entry["plan"] is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return entry["plan"]
+
+
+def test_slow_query_is_logged_with_plan(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 5)
+    slow_query_log.clear()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": 0.05})
+    entries = slow_query_log.entries()
+    assert len(entries) == 1
+    entry = entries[0]
+    assert "pg_sleep" in entry["statement"]
+    assert entry["parameters"] == {"seconds": "float"}
+    assert entry["duration_ms"] >= 50
+    plan = wait_for_plan(entry)
+    assert plan[0]["Plan"]["Node Type"] == "Result"
+
+
+def test_only_crud_reads_are_analyzed(monkeypatch: MonkeyPatch, db: Session) -> None:
+    item = create_random_item(db)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_ANALYZE", True)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.001)
+    slow_query_log.clear()
+    crud.item.get(db, id=item.id)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_try_advisory_lock(1)"))
+        conn.execute(text("SELECT pg_advisory_unlock(1)"))
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    plans = {
+        entry["statement"]: wait_for_plan(entry)[0]["Plan"]
+        for entry in slow_query_log.entries()
+    }
+    [read] = [plan for statement, plan in plans.items() if "FROM item" in statement]
+    assert "Actual Total Time" in read
+    lock = plans["SELECT pg_try_advisory_lock(1)"]
+    assert "Actual Total Time" not in lock
+
+
+def test_slow_query_log_disabled(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    slow_query_log.clear()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_sleep(0.01)"))
+    assert slow_query_log.entries() == []
+
+
+def test_redact_parameters() -> None:
+    assert redact_parameters({"email": "a@b.c", "id": 1}) == {
+        "email": "str",
+        "id": "int",
+    }
+    assert redact_parameters(("secret", None)) == ["str", "NoneType"]
+
+
+def test_describe_endpoint() -> None:
+    def read_items() -> None:
+        pass
+
+    scope = {"method": "GET", "path": "/api/v1/items/", "endpoint": read_items}
+    assert describe_endpoint(scope) == "GET /api/v1/items/ (read_items)"
+    assert describe_endpoint(None) is None
+
+
+def test_read_slow_queries(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 5)
+    slow_query_log.clear()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_sleep(0.01)"))
+    wait_for_plan(slow_query_log.entries()[0])
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/slow-queries/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    [entry] = r.json()
+    assert "pg_sleep" in entry["statement"]
+    assert entry["plan"]
@@ -0,0 +1,23 @@
+import socket
+from typing import Any, List, Set
+
+
+class RecordingHandler:
+    """
+    aiosmtpd handler keeping every recipient and SMTP session it has seen.
+    """
+
+    def __init__(self) -> None:
+        self.recipients: List[str] = []
+        self.sessions: Set[int] = set()
+
+    async def handle_DATA(self, server: Any, session: Any, envelope: Any) -> str:
+        self.recipients.extend(envelope.rcpt_tos)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
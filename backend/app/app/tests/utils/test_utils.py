@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+
+from app.utils import (
+    EmailTemplateRegistry,
+    decode_page_cursor,
+    decode_ranked_page_cursor,
+    generate_page_cursor,
+)
+
+
+def test_page_cursor_roundtrip() -> None:
+    cursor = generate_page_cursor(owner_id=1, id=42)
+    assert decode_page_cursor(cursor) == {"owner_id": 1, "id": 42}
+    assert decode_page_cursor("not a cursor") is None
+
+
+def test_ranked_page_cursor_roundtrip() -> None:
+    cursor = generate_page_cursor(rank=0.5, id=42)
+    assert decode_ranked_page_cursor(cursor) == (0.5, {"id": 42})
+    assert decode_page_cursor(cursor) is None
+    assert decode_ranked_page_cursor(generate_page_cursor(id=42)) is None
+
+
+def test_email_template_registry_caches(tmp_path: Path) -> None:
+    (tmp_path / "hello.html").write_text("Hello {{ name }}")
+    registry = EmailTemplateRegistry(str(tmp_path))
+    template = registry.get("hello.html")
+    (tmp_path / "hello.html").write_text("Bye {{ name }}")
+    assert registry.get("hello.html") is template
+    assert registry.render("hello.html", {"name": "Ada"}) == "Hello Ada"
+
+
+def test_email_template_registry_auto_reload(tmp_path: Path) -> None:
+    path = tmp_path / "hello.html"
+    path.write_text("Hello {{ name }}")
+    registry = EmailTemplateRegistry(str(tmp_path), auto_reload=True)
+    assert registry.render("hello.html", {"name": "Ada"}) == "Hello Ada"
+    path.write_text("Bye {{ name }}")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+    assert registry.render("hello.html", {"name": "Ada"}) == "Bye Ada"
+
+
+def test_email_template_registry_render_many(tmp_path: Path) -> None:
+    (tmp_path / "hello.html").write_text("Hello {{ name }}")
+    registry = EmailTemplateRegistry(str(tmp_path))
+    rendered = registry.render_many("hello.html", [{"name": "Ada"}, {"name": "Bob"}])
+    assert list(rendered) == ["Hello Ada", "Hello Bob"]
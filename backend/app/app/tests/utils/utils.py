@@ -1,10 +1,14 @@
 import random
 import string
-from typing import Dict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.core.config import settings
+from app.db.query_stats import QueryStats, track_queries
+from app.db.session import engine
 
 
 def random_lower_string() -> str:
@@ -25,3 +29,33 @@ def get_superuser_token_headers(client: TestClient) -> Dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+@contextmanager
+def count_pool_checkouts() -> Iterator[List[Any]]:
+    """
+    Collect one entry per connection checked out of the engine pool in the block.
+    """
+    checkouts: List[Any] = []
+
+    def on_checkout(*args: Any) -> None:
+        checkouts.append(args)
+
+    event.listen(engine, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than `max_queries` SQL statements.
+    """
+    with track_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, (
+        f"{stats.count} queries over a budget of {max_queries}: "
+        f"{list(stats.executions)}"
+    )
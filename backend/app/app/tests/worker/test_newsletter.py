@@ -0,0 +1,61 @@
+import time
+
+from sqlalchemy.orm import Session
+
+from app import crud, newsletter
+from app.models.issue_chunk import IssueChunk
+from app.schemas.issue import IssueCreate
+from app.tests.utils.smtp import RecordingHandler
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def test_rate_limiter_spaces_permits() -> None:
+    limiter = newsletter.RateLimiter(20)
+    start = time.monotonic()
+    for _ in range(30):
+        limiter.acquire()
+    # 20 permits are available at once, the other 10 trickle in at 20/s.
+    assert time.monotonic() - start >= 0.45
+
+
+def test_create_chunks_is_resumable(db: Session) -> None:
+    issue_in = IssueCreate(subject=random_lower_string(), body="Hi {{ email }}")
+    issue = crud.issue.create(db, obj_in=issue_in)
+    create_random_user(db)
+    chunks = crud.issue.create_chunks(db, issue_id=issue.id, chunk_size=50)
+    assert chunks
+    assert all(
+        previous.last_user_id < chunk.first_user_id
+        for previous, chunk in zip(chunks, chunks[1:])
+    )
+    assert crud.issue.create_chunks(db, issue_id=issue.id, chunk_size=50) == []
+    progress = crud.issue.get_progress(db, issue_id=issue.id)
+    assert progress["recipients"] == sum(chunk.recipient_count for chunk in chunks)
+    assert progress["chunks"] == len(chunks)
+
+
+def test_send_chunk_resumes_after_last_sent(
+    db: Session, smtp_server: RecordingHandler
+) -> None:
+    issue_in = IssueCreate(subject="Issue for {{ email }}", body="Hi {{ email }}")
+    issue = crud.issue.create(db, obj_in=issue_in)
+    users = [create_random_user(db) for _ in range(3)]
+    # The first recipient was reached before the previous worker stopped.
+    chunk = IssueChunk(
+        issue_id=issue.id,
+        first_user_id=users[0].id,
+        last_user_id=users[-1].id,
+        sent_through_user_id=users[0].id,
+        recipient_count=3,
+        sent_count=1,
+    )
+    db.add(chunk)
+    db.commit()
+
+    assert newsletter.send_chunk(chunk.id) == 2
+    assert smtp_server.recipients == [user.email for user in users[1:]]
+    assert newsletter.send_chunk(chunk.id) == 0
+    db.refresh(chunk)
+    assert chunk.completed_at
+    assert chunk.sent_count == 3
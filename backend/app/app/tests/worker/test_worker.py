@@ -0,0 +1,41 @@
+from smtplib import SMTPException
+from typing import Any, Dict, List
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from celery.exceptions import Retry
+
+from app import worker
+from app.tests.utils.smtp import RecordingHandler
+from app.utils import build_test_email, send_templated_email
+
+
+def test_send_emails_reuses_connection(smtp_server: RecordingHandler) -> None:
+    recipients = [f"user{n}@example.com" for n in range(3)]
+    assert worker.send_emails([build_test_email(email) for email in recipients]) == 3
+    assert worker.send_emails([build_test_email("late@example.com")]) == 1
+    assert smtp_server.recipients == recipients + ["late@example.com"]
+    assert len(smtp_server.sessions) == 1
+
+
+def test_send_emails_retries_only_failed(
+    smtp_server: RecordingHandler, monkeypatch: MonkeyPatch
+) -> None:
+    def send_or_fail(email: Dict[str, Any], **kwargs: Any) -> Any:
+        if email["email_to"] == "user1@example.com":
+            raise SMTPException("recipient refused")
+        return send_templated_email(email, **kwargs)
+
+    retried: List[Dict[str, Any]] = []
+
+    def retry(*, args: List[Any], exc: Exception) -> Retry:
+        retried.extend(args[0])
+        return Retry(exc=exc)
+
+    monkeypatch.setattr(worker, "send_templated_email", send_or_fail)
+    monkeypatch.setattr(worker.send_emails, "retry", retry)
+    recipients = [f"user{n}@example.com" for n in range(3)]
+    with pytest.raises(Retry):
+        worker.send_emails([build_test_email(email) for email in recipients])
+    assert smtp_server.recipients == ["user0@example.com", "user2@example.com"]
+    assert [email["email_to"] for email in retried] == ["user1@example.com"]
@@ -1,90 +1,197 @@
+import base64
+import csv
+import io
+import json
 import logging
+import os
+import threading
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import emails
+from emails.backend.smtp import SMTPBackend
 from emails.template import JinjaTemplate
 from jose import jwt
 
+from app.core.celery_app import celery_app
 from app.core.config import settings
 
 
+class EmailTemplateRegistry:
+    def __init__(self, templates_dir: str, *, auto_reload: bool = False):
+        """
+        Process-wide cache of compiled email templates.
+
+        **Parameters**
+
+        * `templates_dir`: Directory the template names are relative to
+        * `auto_reload`: Re-read a template when its file's mtime changes (dev)
+        """
+        self.templates_dir = Path(templates_dir)
+        self.auto_reload = auto_reload
+        self._templates: Dict[str, Tuple[float, JinjaTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> JinjaTemplate:
+        path = self.templates_dir / name
+        with self._lock:
+            cached = self._templates.get(name)
+            if cached and not self.auto_reload:
+                return cached[1]
+            mtime = os.stat(path).st_mtime
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(path) as f:
+                template = JinjaTemplate(f.read())
+            self._templates[name] = (mtime, template)
+            return template
+
+    def render(self, name: str, environment: Dict[str, Any]) -> str:
+        return self.get(name).render(**environment)
+
+    def render_many(
+        self, name: str, environments: Iterable[Dict[str, Any]]
+    ) -> Iterator[str]:
+        template = self.get(name)
+        for environment in environments:
+            yield template.render(**environment)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+email_templates = EmailTemplateRegistry(
+    settings.EMAIL_TEMPLATES_DIR, auto_reload=settings.EMAIL_TEMPLATES_AUTO_RELOAD
+)
+
+
+def get_smtp_options() -> Dict[str, Any]:
+    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
+    if settings.SMTP_TLS:
+        smtp_options["tls"] = True
+    if settings.SMTP_USER:
+        smtp_options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        smtp_options["password"] = settings.SMTP_PASSWORD
+    return smtp_options
+
+
 def send_email(
     email_to: str,
     subject_template: str = "",
-    html_template: str = "",
+    html_template: Union[str, JinjaTemplate] = "",
     environment: Dict[str, Any] = {},
-) -> None:
+    smtp: Optional[SMTPBackend] = None,
+) -> Any:
+    """
+    Send one email, over `smtp` when given (keeping its connection open for the
+    next send) or else over a new connection, and return the SMTP response.
+    """
     assert settings.EMAILS_ENABLED, "no provided configuration for email variables"
+    if isinstance(html_template, str):
+        html_template = JinjaTemplate(html_template)
     message = emails.Message(
         subject=JinjaTemplate(subject_template),
-        html=JinjaTemplate(html_template),
+        html=html_template,
         mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, render=environment, smtp=smtp_options)
+    response = message.send(
+        to=email_to, render=environment, smtp=smtp or get_smtp_options()
+    )
     logging.info(f"send email result: {response}")
+    return response
 
 
-def send_test_email(email_to: str) -> None:
+def send_templated_email(
+    email: Dict[str, Any], smtp: Optional[SMTPBackend] = None
+) -> Any:
+    """
+    Send an email described by one of the `build_*_email` helpers and return the
+    SMTP response.
+    """
+    return send_email(
+        email_to=email["email_to"],
+        subject_template=email["subject_template"],
+        html_template=email_templates.get(email["template_name"]),
+        environment=email["environment"],
+        smtp=smtp,
+    )
+
+
+def enqueue_emails(emails: List[Dict[str, Any]]) -> None:
+    """
+    Hand emails built by the `build_*_email` helpers to the worker, which sends
+    each batch over a single SMTP connection.
+    """
+    celery_app.send_task("app.worker.send_emails", args=[emails])
+
+
+def build_test_email(email_to: str) -> Dict[str, Any]:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - Test email"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "test_email.html") as f:
-        template_str = f.read()
-    send_email(
-        email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
-        environment={"project_name": settings.PROJECT_NAME, "email": email_to},
-    )
+    return {
+        "email_to": email_to,
+        "subject_template": subject,
+        "template_name": "test_email.html",
+        "environment": {"project_name": settings.PROJECT_NAME, "email": email_to},
+    }
 
 
-def send_reset_password_email(email_to: str, email: str, token: str) -> None:
+def build_reset_password_email(email_to: str, email: str, token: str) -> Dict[str, Any]:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - Password recovery for user {email}"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "reset_password.html") as f:
-        template_str = f.read()
     server_host = settings.SERVER_HOST
     link = f"{server_host}/reset-password?token={token}"
-    send_email(
-        email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
-        environment={
+    return {
+        "email_to": email_to,
+        "subject_template": subject,
+        "template_name": "reset_password.html",
+        "environment": {
             "project_name": settings.PROJECT_NAME,
             "username": email,
             "email": email_to,
             "valid_hours": settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS,
             "link": link,
         },
-    )
+    }
 
 
-def send_new_account_email(email_to: str, username: str, password: str) -> None:
+def build_new_account_email(email_to: str, username: str, token: str) -> Dict[str, Any]:
+    """
+    Welcome email with a link for choosing a password; `token` is a password
+    reset token, so the password itself never passes through the broker.
+    """
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - New account for user {username}"
-    with open(Path(settings.EMAIL_TEMPLATES_DIR) / "new_account.html") as f:
-        template_str = f.read()
-    link = settings.SERVER_HOST
-    send_email(
-        email_to=email_to,
-        subject_template=subject,
-        html_template=template_str,
-        environment={
+    server_host = settings.SERVER_HOST
+    return {
+        "email_to": email_to,
+        "subject_template": subject,
+        "template_name": "new_account.html",
+        "environment": {
             "project_name": settings.PROJECT_NAME,
             "username": username,
-            "password": password,
             "email": email_to,
-            "link": link,
+            "valid_hours": settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS,
+            "set_password_link": f"{server_host}/reset-password?token={token}",
+            "link": str(server_host),
         },
-    )
+    }
+
+
+def send_test_email(email_to: str) -> None:
+    send_templated_email(build_test_email(email_to))
+
+
+def send_reset_password_email(email_to: str, email: str, token: str) -> None:
+    send_templated_email(build_reset_password_email(email_to, email, token))
+
+
+def send_new_account_email(email_to: str, username: str, token: str) -> None:
+    send_templated_email(build_new_account_email(email_to, username, token))
 
 
 def generate_password_reset_token(email: str) -> str:
@@ -101,6 +208,86 @@ def generate_password_reset_token(email: str) -> str:
 def verify_password_reset_token(token: str) -> Optional[str]:
     try:
         decoded_token = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return decoded_token["email"]
+        return decoded_token["sub"]
     except jwt.JWTError:
         return None
+
+
+def generate_page_cursor(**keys: Union[int, float]) -> str:
+    raw = json.dumps(keys, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _load_page_cursor(cursor: str) -> Optional[Dict[str, Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        keys = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        return None
+    return keys if isinstance(keys, dict) else None
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def decode_page_cursor(cursor: str) -> Optional[Dict[str, int]]:
+    keys = _load_page_cursor(cursor)
+    if keys is None or not all(_is_int(value) for value in keys.values()):
+        return None
+    return keys
+
+
+def decode_ranked_page_cursor(cursor: str) -> Optional[Tuple[float, Dict[str, int]]]:
+    """
+    The `rank` of a cursor for ranked results, and its other (integer) keys.
+    """
+    keys = _load_page_cursor(cursor)
+    if keys is None:
+        return None
+    rank = keys.pop("rank", None)
+    if not (_is_int(rank) or isinstance(rank, float)) or not all(
+        _is_int(value) for value in keys.values()
+    ):
+        return None
+    return float(rank), keys
+
+
+def iter_batches(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_ndjson(
+    rows: Iterable[Sequence[Any]], *, columns: Sequence[str], batch_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON objects, one chunk per `batch_size` rows.
+    """
+    for batch in iter_batches(rows, batch_size):
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n"
+            for row in batch
+        ).encode()
+
+
+def iter_csv(
+    rows: Iterable[Sequence[Any]], *, columns: Sequence[str], batch_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    Encode rows as CSV after a header line, one chunk per `batch_size` rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in iter_batches(rows, batch_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -1,11 +1,106 @@
+import logging
+from smtplib import SMTPException
+from typing import Any, Dict, List, Optional
+
+from celery.signals import task_failure, task_postrun, task_prerun, worker_init
+from emails.backend.smtp import SMTPBackend
+from prometheus_client import start_http_server
 from raven import Client
 
+from app import crud, newsletter
+from app.core import metrics
 from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils import get_smtp_options, send_templated_email
 
 client_sentry = Client(settings.SENTRY_DSN)
 
+task_prerun.connect(metrics.on_task_prerun, weak=False)
+task_postrun.connect(metrics.on_task_postrun, weak=False)
+task_failure.connect(metrics.on_task_failure, weak=False)
+
+
+@worker_init.connect
+def serve_metrics(**kwargs: Any) -> None:
+    # Task metrics are recorded in the pool's child processes; with
+    # PROMETHEUS_MULTIPROC_DIR set, the main process serves them all
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT, registry=metrics.get_registry())
+
+
+# One SMTP connection per worker process, shared by every batch it sends.
+smtp_backend: Optional[SMTPBackend] = None
+
+
+def get_smtp_backend() -> SMTPBackend:
+    global smtp_backend
+    if smtp_backend is None:
+        smtp_backend = SMTPBackend(**get_smtp_options())
+    return smtp_backend
+
 
 @celery_app.task(acks_late=True)
 def test_celery(word: str) -> str:
     return f"test task return {word}"
+
+
+@celery_app.task(bind=True, acks_late=True, max_retries=5, default_retry_delay=60)
+def send_emails(self: Any, emails: List[Dict[str, Any]]) -> int:
+    """
+    Send a batch of emails and return how many went out. Emails that failed
+    don't stop the rest of the batch; the task is retried with just those.
+    """
+    smtp = get_smtp_backend()
+    failed = []
+    sent = 0
+    for email in emails:
+        try:
+            response = send_templated_email(email, smtp=smtp)
+        except Exception as e:
+            logging.warning(f"email to {email['email_to']} failed: {e!r}")
+            failed.append(email)
+            # Drop a possibly broken connection; the next send opens a fresh one.
+            smtp.close()
+            continue
+        if response.status_code is None or 400 <= response.status_code < 500:
+            # No connection, or a temporary failure worth retrying
+            logging.warning(f"email to {email['email_to']} failed: {response.error}")
+            failed.append(email)
+            smtp.close()
+        elif response.status_code == 250:
+            sent += 1
+        else:
+            logging.warning(
+                f"email to {email['email_to']} rejected: "
+                f"{response.status_code} {response.status_text}"
+            )
+    if failed:
+        raise self.retry(
+            args=[failed], exc=SMTPException(f"{len(failed)} emails not sent")
+        )
+    return sent
+
+
+@celery_app.task(acks_late=True)
+def fan_out_issue(issue_id: int) -> int:
+    db = SessionLocal()
+    try:
+        chunks = crud.issue.create_chunks(
+            db, issue_id=issue_id, chunk_size=settings.NEWSLETTER_CHUNK_SIZE
+        )
+        for chunk in chunks:
+            celery_app.send_task("app.worker.send_issue_chunk", args=[chunk.id])
+        return len(chunks)
+    finally:
+        db.close()
+
+
+@celery_app.task(
+    acks_late=True,
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    max_retries=None,
+)
+def send_issue_chunk(chunk_id: int) -> int:
+    return newsletter.send_chunk(chunk_id)
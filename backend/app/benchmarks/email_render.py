@@ -0,0 +1,52 @@
+"""
+Rendering personalized emails by re-reading the template for every recipient
+vs. rendering all of them against the cached compiled template.
+
+Run inside the backend container: `python -m benchmarks.email_render`.
+"""
+import logging
+from pathlib import Path
+
+from emails.template import JinjaTemplate
+
+from app.core.config import settings
+from app.utils import email_templates
+from benchmarks.utils import timed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RECIPIENTS = 10_000
+TEMPLATE = "new_account.html"
+
+environments = [
+    {
+        "project_name": settings.PROJECT_NAME,
+        "username": f"user{n}@example.com",
+        "password": "secret",
+        "email": f"user{n}@example.com",
+        "link": settings.SERVER_HOST,
+    }
+    for n in range(RECIPIENTS)
+]
+
+
+def render_uncached() -> None:
+    for environment in environments:
+        with open(Path(settings.EMAIL_TEMPLATES_DIR) / TEMPLATE) as f:
+            JinjaTemplate(f.read()).render(**environment)
+
+
+def render_cached() -> None:
+    for _ in email_templates.render_many(TEMPLATE, environments):
+        pass
+
+
+def main() -> None:
+    for name, func in [("uncached", render_uncached), ("cached", render_cached)]:
+        elapsed = timed(func, repeat=3)
+        logger.info(f"{name:>9}: {elapsed:9.1f}ms for {RECIPIENTS} emails")
+
+
+if __name__ == "__main__":
+    main()
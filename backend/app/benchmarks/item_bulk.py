@@ -0,0 +1,70 @@
+"""
+Throughput of row-by-row CRUDBase writes vs the *_multi bulk paths.
+
+Run inside the backend container: `python -m benchmarks.item_bulk`.
+"""
+import logging
+
+from app import crud
+from app.db.session import SessionLocal
+from app.schemas.item import ItemCreate, ItemUpdate
+from benchmarks.utils import create_bench_user, timed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def main() -> None:
+    db = SessionLocal()
+    user = create_bench_user(db)
+    items_in = [ItemCreate(title=f"bench {n}") for n in range(BATCH_SIZE)]
+    created = []
+
+    def create_rows() -> None:
+        for item_in in items_in:
+            created.append(
+                crud.item.create_with_owner(db, obj_in=item_in, owner_id=user.id)
+            )
+
+    def create_bulk() -> None:
+        created.extend(
+            crud.item.create_multi_with_owner(db, objs_in=items_in, owner_id=user.id)
+        )
+
+    def update_rows() -> None:
+        for db_obj in db_objs:
+            crud.item.update(db, db_obj=db_obj, obj_in=ItemUpdate(description="x"))
+
+    def update_bulk() -> None:
+        crud.item.update_multi(
+            db, db_objs=db_objs, objs_in=[ItemUpdate(description="y") for _ in db_objs],
+        )
+
+    for name, func in [("create", create_rows), ("create_multi", create_bulk)]:
+        elapsed = timed(func, repeat=1)
+        logger.info(f"{name:>14}: {BATCH_SIZE / elapsed * 1000:10.0f} rows/s")
+
+    db_objs = crud.item.get_multi_by_ids(db, ids=[item.id for item in created])
+    for name, func in [("update", update_rows), ("update_multi", update_bulk)]:
+        elapsed = timed(func, repeat=1)
+        logger.info(f"{name:>14}: {len(db_objs) / elapsed * 1000:10.0f} rows/s")
+
+    ids = [db_obj.id for db_obj in db_objs]
+    half = len(ids) // 2
+    row_ids, bulk_ids = ids[:half], ids[half:]
+
+    def remove_rows() -> None:
+        for id in row_ids:
+            crud.item.remove(db, id=id)
+
+    elapsed = timed(remove_rows, repeat=1)
+    logger.info(f"{'remove':>14}: {len(row_ids) / elapsed * 1000:10.0f} rows/s")
+    elapsed = timed(lambda: crud.item.remove_multi(db, ids=bulk_ids), repeat=1)
+    logger.info(f"{'remove_multi':>14}: {len(bulk_ids) / elapsed * 1000:10.0f} rows/s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Deep-page latency of offset vs keyset (cursor) paging over the item table.
+
+Run inside the backend container: `python -m benchmarks.item_pagination`.
+"""
+import logging
+
+from app import crud
+from app.db.session import SessionLocal
+from app.models.item import Item
+from benchmarks.utils import create_bench_user, seed_items, timed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROWS = 1_000_000
+PAGE_SIZE = 100
+
+
+def main() -> None:
+    db = SessionLocal()
+    user = create_bench_user(db)
+    logger.info(f"Seeding {ROWS} items")
+    seed_items(db, owner_id=user.id, count=ROWS)
+    for depth in range(0, ROWS, ROWS // 10):
+        # Id of the row just before the page, i.e. what a cursor would carry.
+        after_id = (
+            db.query(Item.id)
+            .filter(Item.owner_id == user.id)
+            .order_by(Item.id)
+            .offset(depth)
+            .limit(1)
+            .scalar()
+        ) - 1
+        offset_ms = timed(
+            lambda: crud.item.get_multi_by_owner(
+                db, owner_id=user.id, skip=depth, limit=PAGE_SIZE
+            )
+        )
+        cursor_ms = timed(
+            lambda: crud.item.get_multi_by_owner(
+                db, owner_id=user.id, after_id=after_id, limit=PAGE_SIZE
+            )
+        )
+        logger.info(
+            f"depth={depth:>7} offset={offset_ms:8.2f}ms cursor={cursor_ms:8.2f}ms"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
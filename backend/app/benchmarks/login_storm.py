@@ -0,0 +1,75 @@
+"""
+`GET /items/` latency with and without a concurrent login storm.
+
+Run against a live backend: `python -m benchmarks.login_storm`. Set
+BENCHMARK_BASE_URL to point somewhere other than http://localhost.
+"""
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("BENCHMARK_BASE_URL", "http://localhost") + settings.API_V1_STR
+LOGIN_CLIENTS = 32
+ITEM_REQUESTS = 200
+
+
+def login() -> requests.Response:
+    return requests.post(
+        f"{BASE_URL}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+
+
+def item_latencies(headers: Dict[str, str]) -> List[float]:
+    latencies = []
+    for _ in range(ITEM_REQUESTS):
+        start = time.perf_counter()
+        requests.get(f"{BASE_URL}/items/", headers=headers, params={"limit": 10})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    logger.info(
+        f"{name:>12}: p50={statistics.median(latencies):7.2f}ms p99={p99:7.2f}ms"
+    )
+
+
+def main() -> None:
+    token = login().json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    report("idle", item_latencies(headers))
+
+    stop = threading.Event()
+    statuses: Dict[int, int] = {}
+
+    def storm() -> None:
+        while not stop.is_set():
+            status = login().status_code
+            statuses[status] = statuses.get(status, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=LOGIN_CLIENTS) as executor:
+        for _ in range(LOGIN_CLIENTS):
+            executor.submit(storm)
+        report("login storm", item_latencies(headers))
+        stop.set()
+    logger.info(f"login responses by status: {statuses}")
+
+
+if __name__ == "__main__":
+    main()
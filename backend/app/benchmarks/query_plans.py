@@ -0,0 +1,124 @@
+"""
+Check that the hot item and user queries are served by index scans.
+
+Seeds BENCHMARK_USERS users with BENCHMARK_ITEMS_PER_USER items each, runs
+every query through the CRUD layer, EXPLAINs the SQL it sent and exits non-zero
+if any plan reads the item or user table sequentially.
+
+Run inside the backend container: `python -m benchmarks.query_plans`.
+"""
+import json
+import logging
+import os
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.db.session import SessionLocal
+from benchmarks.utils import seed_users, timed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USERS = int(os.getenv("BENCHMARK_USERS", "1000"))
+ITEMS_PER_USER = int(os.getenv("BENCHMARK_ITEMS_PER_USER", "1000"))
+PAGE_SIZE = 100
+CHECKED_TABLES = {"item", "user"}
+
+
+def capture_queries(db: Session, func: Callable[[], Any]) -> List[Tuple[str, Any]]:
+    """
+    Run `func` and return the SELECT statements (with parameters) it sent.
+    """
+    queries: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            queries.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return queries
+
+
+def iter_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def explain(db: Session, statement: str, parameters: Any) -> Dict[str, Any]:
+    result = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def main() -> None:
+    db = SessionLocal()
+    logger.info(f"Seeding {USERS} users x {ITEMS_PER_USER} items")
+    user_ids = seed_users(db, count=USERS, items_per_user=ITEMS_PER_USER)
+    owner_id = user_ids[len(user_ids) // 2]
+    owner = crud.user.get(db, id=owner_id)
+    assert owner
+    owned = crud.item.get_multi_by_owner(db, owner_id=owner_id, limit=PAGE_SIZE)
+    middle_id = owned[len(owned) // 2].id
+    queries: Dict[str, Callable[[], Any]] = {
+        "item.get": lambda: crud.item.get(db, id=middle_id),
+        "item.get_multi_by_ids": lambda: crud.item.get_multi_by_ids(
+            db, ids=[item.id for item in owned]
+        ),
+        "item.get_multi after_id": lambda: crud.item.get_multi(
+            db, limit=PAGE_SIZE, after_id=middle_id
+        ),
+        "item.get_multi_by_owner": lambda: crud.item.get_multi_by_owner(
+            db, owner_id=owner_id, limit=PAGE_SIZE
+        ),
+        "item.get_multi_by_owner after_id": lambda: crud.item.get_multi_by_owner(
+            db, owner_id=owner_id, limit=PAGE_SIZE, after_id=middle_id
+        ),
+        "item.search": lambda: crud.item.search(
+            db, q=owned[0].description, owner_id=owner_id, limit=PAGE_SIZE
+        ),
+        "user.get": lambda: crud.user.get(db, id=owner_id),
+        "user.get_by_email": lambda: crud.user.get_by_email(db, email=owner.email),
+    }
+    failures = []
+    for name, func in queries.items():
+        scans = []
+        for statement, parameters in capture_queries(db, func):
+            scans.extend(
+                node
+                for node in iter_plan_nodes(explain(db, statement, parameters))
+                if node.get("Relation Name") in CHECKED_TABLES
+            )
+        if any(node["Node Type"] == "Seq Scan" for node in scans):
+            failures.append(name)
+        plans = ", ".join(
+            f"{node['Node Type']} on {node['Relation Name']}" for node in scans
+        )
+        logger.info(f"{name:<34} {timed(func):8.2f}ms {plans}")
+    db.close()
+    if failures:
+        sys.exit(f"Sequential scans in: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import time
+from typing import Any, Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.schemas.user import UserCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def timed(func: Callable[[], Any], *, repeat: int = 5) -> float:
+    """
+    Best-of-`repeat` wall time of `func` in milliseconds.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def create_bench_user(db: Session) -> models.User:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    return crud.user.create(db, obj_in=user_in)
+
+
+def seed_items(db: Session, *, owner_id: int, count: int) -> None:
+    db.execute(
+        text(
+            "INSERT INTO item (title, description, owner_id) "
+            "SELECT 'bench ' || n, md5(n::text), :owner_id "
+            "FROM generate_series(1, :count) AS n"
+        ),
+        {"owner_id": owner_id, "count": count},
+    )
+    db.execute(
+        text('UPDATE "user" SET item_count = item_count + :count WHERE id = :owner_id'),
+        {"owner_id": owner_id, "count": count},
+    )
+    db.commit()
+    db.execute(text("ANALYZE item"))
+    db.commit()
+
+
+def seed_users(db: Session, *, count: int, items_per_user: int = 0) -> List[int]:
+    """
+    Insert `count` users, each owning `items_per_user` items, and return their ids.
+    """
+    user_ids = list(
+        db.execute(
+            text(
+                'INSERT INTO "user" '
+                "(email, hashed_password, is_active, is_superuser, item_count) "
+                "SELECT 'bench-' || md5(random()::text) || '@example.com', '', "
+                "true, false, :items_per_user "
+                "FROM generate_series(1, :count) RETURNING id"
+            ),
+            {"count": count, "items_per_user": items_per_user},
+        ).scalars()
+    )
+    db.execute(
+        text(
+            "INSERT INTO item (title, description, owner_id) "
+            "SELECT 'bench ' || n, md5(n::text), owner_id "
+            "FROM unnest(CAST(:user_ids AS integer[])) AS owner_id, "
+            "generate_series(1, :count) AS n"
+        ),
+        {"user_ids": user_ids, "count": items_per_user},
+    )
+    db.commit()
+    db.execute(text('ANALYZE "user"'))
+    db.execute(text("ANALYZE item"))
+    db.commit()
+    return user_ids
@@ -0,0 +1,11 @@
+# Loaded instead of the base image's /gunicorn_conf.py, which it extends
+import runpy
+from typing import Any
+
+from app.core.metrics import mark_process_dead
+
+globals().update(runpy.run_path("/gunicorn_conf.py"))
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    mark_process_dead(worker.pid)
@@ -8,3 +8,9 @@ alembic upgrade head
 
 # Create initial data in DB
 python /app/app/initial_data.py
+
+# Start multiprocess metrics from scratch; files of old worker pids would linger
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
@@ -3,4 +3,15 @@ set -e
 
 python /app/app/celeryworker_pre_start.py
 
-celery worker -A app.worker -l info -Q main-queue -c 1
+# Start multiprocess metrics from scratch; files of old pool pids would linger
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+# Run one worker per queue (CELERY_QUEUE), so a newsletter being sent can't
+# hold up account emails behind it
+CELERY_QUEUE=${CELERY_QUEUE:-main-queue}
+CELERY_CONCURRENCY=${CELERY_CONCURRENCY:-2}
+
+celery worker -A app.worker -l info -Q "$CELERY_QUEUE" -c "$CELERY_CONCURRENCY" -n "$CELERY_QUEUE@%h"